@@ -5,15 +5,20 @@ Python API for accessing and querying RepoGraph data.
 Provides functions to load graphs, query nodes/edges, and serialize for web consumption.
 """
 
+import gzip
+import hashlib
+import os
 import pickle
-import json
+from array import array
+from collections import defaultdict
 import networkx as nx
+import orjson
 from pathlib import Path
-from typing import Optional, Any
-from dataclasses import dataclass, asdict
+from typing import Any, Iterator, Optional
+from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NodeInfo:
     """Information about a graph node."""
     id: str
@@ -21,21 +26,59 @@ class NodeInfo:
     category: str  # 'class' or 'function'
     kind: str  # 'def' or 'ref'
     file: str
-    line: list[int]
+    line: tuple[int, ...]  # (start, end); a tuple so shared instances stay immutable
     info: str
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "id": self.id,
+            "name": self.name,
+            "category": self.category,
+            "kind": self.kind,
+            "file": self.file,
+            "line": list(self.line),
+            "info": self.info,
+        }
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EdgeInfo:
     """Information about a graph edge."""
     source: str
     target: str
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {"source": self.source, "target": self.target}
+
+
+# RLM issue severities ranked for picking a file's worst issue
+SEVERITY_RANK = {"low": 1, "medium": 2, "high": 3, "critical": 4}
+# UI color per rank; unknown severities count as low
+RANK_COLORS = ("yellow", "yellow", "orange", "red", "purple")
+
+
+def _bfs(indptr: array, indices: array, start: int, depth: int) -> list[int]:
+    """
+    Return ids of nodes reachable from start within depth hops, excluding start.
+
+    Works only on the integer CSR arrays so the loop stays free of name lookups.
+    """
+    visited = bytearray(len(indptr) - 1)
+    visited[start] = 1
+    found = []
+    frontier = [start]
+    for _ in range(depth):
+        next_frontier = []
+        for node in frontier:
+            for neighbor in indices[indptr[node]:indptr[node + 1]]:
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    next_frontier.append(neighbor)
+        if not next_frontier:
+            break
+        found.extend(next_frontier)
+        frontier = next_frontier
+    return found
 
 
 class GraphAPI:
@@ -65,43 +108,185 @@ class GraphAPI:
         """
         self.output_dir = Path(repo_output_dir)
         self.graph_path = self.output_dir / "graph.pkl"
+        self.snapshot_path = self.output_dir / "graph_snapshot.json"
         self.tags_path = self.output_dir / "tags.json"
-        self.graph: Optional[nx.MultiDiGraph] = None
+        self._graph: Optional[nx.MultiDiGraph] = None
         self.tags: list[dict] = []
-        self._node_index: dict[str, dict] = {}
+        self._node_index: dict[str, int] = {}
+        self._node_infos: list[NodeInfo] = []
+        self._node_dicts: Optional[list[dict]] = None
+        self._edge_dicts: Optional[list[dict]] = None
+        self._nodes_by_file: dict[str, list[int]] = {}
+        self._files_sorted: list[str] = []
+        self._json_cache: dict[str, bytes] = {}
+        self._encoded_cache: dict[str, tuple[bytes, bytes, str]] = {}
+
+        # Lightweight adjacency used instead of the NetworkX graph
+        self._node_attrs: Optional[dict[str, dict]] = None
+        self._node_names: list[str] = []
+        self._node_ids: dict[str, int] = {}
+        # CSR adjacency: successors of node i are _indices[_indptr[i]:_indptr[i + 1]]
+        self._indptr = array("i")
+        self._indices = array("i")
+        # Transposed CSR: predecessors of node i, in node order
+        self._pred_indptr = array("i")
+        self._pred_indices = array("i")
+
+    @property
+    def graph(self) -> Optional[nx.MultiDiGraph]:
+        """The NetworkX graph, unpickled on first access for callers that need it."""
+        if self._graph is None and self._node_attrs is not None:
+            with open(self.graph_path, "rb") as f:
+                self._graph = pickle.load(f)
+        return self._graph
 
     def load(self) -> "GraphAPI":
         """Load the graph and tags from disk."""
         if not self.graph_path.exists():
             raise FileNotFoundError(f"Graph not found: {self.graph_path}")
 
-        # Load NetworkX graph
-        with open(self.graph_path, "rb") as f:
-            self.graph = pickle.load(f)
+        self._json_cache = {}
+        self._encoded_cache = {}
+        self._node_dicts = None
+        self._edge_dicts = None
+
+        # Prefer the compact snapshot; fall back to the pickle and write one
+        if not self._load_fast():
+            with open(self.graph_path, "rb") as f:
+                graph = pickle.load(f)
+            nodes = list(graph.nodes)
+            index = {name: i for i, name in enumerate(nodes)}
+            attrs = [graph.nodes[name] for name in nodes]
+            edges = [(index[u], index[v]) for u, v in graph.edges()]
+            self._index_graph(nodes, attrs, edges)
+            self._save_fast(nodes, attrs, edges)
 
         # Load tags
         self.tags = []
         if self.tags_path.exists():
-            with open(self.tags_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    if line.strip():
-                        self.tags.append(json.loads(line))
+            raw = self.tags_path.read_bytes()
+            if raw.lstrip()[:1] == b"[":
+                self.tags = orjson.loads(raw)
+            else:
+                # JSONL: one tag per line
+                self.tags = [orjson.loads(line) for line in raw.splitlines() if line.strip()]
 
         # Build node index from tags
         self._build_node_index()
 
         return self
 
+    def _load_fast(self) -> bool:
+        """Load the adjacency from the snapshot if it is at least as new as graph.pkl."""
+        try:
+            if self.snapshot_path.stat().st_mtime_ns < self.graph_path.stat().st_mtime_ns:
+                return False
+            data = orjson.loads(self.snapshot_path.read_bytes())
+            self._index_graph(data["nodes"], data["attrs"], data["edges"])
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            return False
+        return True
+
+    def _save_fast(self, nodes: list[str], attrs: list[dict], edges: list[tuple[int, int]]):
+        """Write the snapshot read by _load_fast(). Failures are ignored."""
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        try:
+            tmp_path.write_bytes(orjson.dumps({"nodes": nodes, "attrs": attrs, "edges": edges}))
+            os.replace(tmp_path, self.snapshot_path)
+        except (OSError, TypeError):
+            pass
+
+    def _index_graph(self, nodes: list[str], attrs: list[dict], edges: list):
+        """Build the CSR adjacency from node names and (source, target) index pairs."""
+        self._node_attrs = dict(zip(nodes, attrs))
+        self._node_names = nodes
+        self._node_ids = {name: i for i, name in enumerate(nodes)}
+
+        # Counting sort by source keeps each node's successors in edge order
+        indptr = [0] * (len(nodes) + 1)
+        for source_idx, _ in edges:
+            indptr[source_idx + 1] += 1
+        for i in range(len(nodes)):
+            indptr[i + 1] += indptr[i]
+        fill = indptr[:-1]
+        indices = [0] * len(edges)
+        for source_idx, target_idx in edges:
+            indices[fill[source_idx]] = target_idx
+            fill[source_idx] += 1
+
+        self._indptr = array("i", indptr)
+        self._indices = array("i", indices)
+
+        # Same counting sort by target, filled in source order
+        pred_indptr = [0] * (len(nodes) + 1)
+        for target_idx in indices:
+            pred_indptr[target_idx + 1] += 1
+        for i in range(len(nodes)):
+            pred_indptr[i + 1] += pred_indptr[i]
+        fill = pred_indptr[:-1]
+        pred_indices = [0] * len(indices)
+        for source_idx in range(len(nodes)):
+            for target_idx in indices[indptr[source_idx]:indptr[source_idx + 1]]:
+                pred_indices[fill[target_idx]] = source_idx
+                fill[target_idx] += 1
+
+        self._pred_indptr = array("i", pred_indptr)
+        self._pred_indices = array("i", pred_indices)
+
+    def _successors(self, idx: int) -> list[str]:
+        names = self._node_names
+        return [names[j] for j in self._indices[self._indptr[idx]:self._indptr[idx + 1]]]
+
+    def _iter_edges(self):
+        """Yield (source, target) name pairs in adjacency order."""
+        names, indptr, indices = self._node_names, self._indptr, self._indices
+        for i, source in enumerate(names):
+            for j in range(indptr[i], indptr[i + 1]):
+                yield source, names[indices[j]]
+
+    def _require_loaded(self):
+        if self._node_attrs is None:
+            raise RuntimeError("Graph not loaded. Call load() first.")
+
     def _build_node_index(self):
         """Build an index of nodes by name for fast lookup."""
         self._node_index = {}
-        for tag in self.tags:
+
+        # NodeInfo objects are immutable, so they are built once and shared
+        self._node_infos = [self._tag_to_node_info(tag) for tag in self.tags]
+
+        # Search indexes hold tag positions so results keep tag order
+        tags_by_name = defaultdict(list)
+        nodes_by_file = defaultdict(list)
+        lower_ids: dict[str, int] = {}
+        self._lower_names: list[str] = []
+        self._tags_by_lower: list[list[int]] = []
+        trigrams = defaultdict(set)
+
+        for i, tag in enumerate(self.tags):
             name = tag["name"]
             if name not in self._node_index:
-                self._node_index[name] = tag
+                self._node_index[name] = i
             elif tag["kind"] == "def":
                 # Prefer definitions over references
-                self._node_index[name] = tag
+                self._node_index[name] = i
+
+            tags_by_name[name].append(i)
+            nodes_by_file[tag["rel_fname"]].append(i)
+            lower = name.lower()
+            lower_id = lower_ids.get(lower)
+            if lower_id is None:
+                lower_id = lower_ids[lower] = len(self._lower_names)
+                self._lower_names.append(lower)
+                self._tags_by_lower.append([])
+                for j in range(len(lower) - 2):
+                    trigrams[lower[j:j + 3]].add(lower_id)
+            self._tags_by_lower[lower_id].append(i)
+
+        self._tags_by_name: dict[str, list[int]] = dict(tags_by_name)
+        self._trigrams: dict[str, set[int]] = dict(trigrams)
+        self._nodes_by_file: dict[str, list[int]] = dict(nodes_by_file)
+        self._files_sorted: list[str] = sorted(self._nodes_by_file)
 
     def get_nodes(self, kind: Optional[str] = None, category: Optional[str] = None) -> list[NodeInfo]:
         """
@@ -114,22 +299,25 @@ class GraphAPI:
         Returns:
             List of NodeInfo objects
         """
-        nodes = []
-        for tag in self.tags:
-            if kind and tag["kind"] != kind:
-                continue
-            if category and tag["category"] != category:
-                continue
-            nodes.append(NodeInfo(
-                id=tag["name"],
-                name=tag["name"],
-                category=tag["category"],
-                kind=tag["kind"],
-                file=tag["rel_fname"],
-                line=tag["line"],
-                info=tag["info"],
-            ))
-        return nodes
+        return list(self.iter_nodes(kind=kind, category=category))
+
+    def iter_nodes(self, kind: Optional[str] = None, category: Optional[str] = None) -> Iterator[NodeInfo]:
+        """Yield nodes lazily with the same filters as get_nodes()."""
+        for node in self._node_infos:
+            if (not kind or node.kind == kind) and (not category or node.category == category):
+                yield node
+
+    def _get_node_dicts(self) -> list[dict]:
+        """to_dict() of every node in tag order, built once per load and shared by callers."""
+        if self._node_dicts is None:
+            self._node_dicts = [node.to_dict() for node in self._node_infos]
+        return self._node_dicts
+
+    def iter_node_dicts(self, kind: Optional[str] = None, category: Optional[str] = None) -> Iterator[dict]:
+        """Like iter_nodes(), but yield the shared node dicts. Callers must not modify them."""
+        for node in self._get_node_dicts():
+            if (not kind or node["kind"] == kind) and (not category or node["category"] == category):
+                yield node
 
     def get_definitions(self) -> list[NodeInfo]:
         """Get all definition nodes (functions and classes)."""
@@ -145,28 +333,37 @@ class GraphAPI:
 
     def get_edges(self) -> list[EdgeInfo]:
         """Get all edges in the graph."""
-        if not self.graph:
-            raise RuntimeError("Graph not loaded. Call load() first.")
+        self._require_loaded()
 
-        edges = []
-        for source, target in self.graph.edges():
-            edges.append(EdgeInfo(source=source, target=target))
-        return edges
+        return list(self.iter_edges())
+
+    def iter_edges(self) -> Iterator[EdgeInfo]:
+        """Yield edges lazily in the same order as get_edges()."""
+        self._require_loaded()
+
+        for source, target in self._iter_edges():
+            yield EdgeInfo(source=source, target=target)
+
+    def get_edge_dicts(self) -> list[dict]:
+        """to_dict() of every edge in get_edges() order, built once per load and shared."""
+        if self._edge_dicts is None:
+            self._require_loaded()
+            self._edge_dicts = [{"source": source, "target": target} for source, target in self._iter_edges()]
+        return self._edge_dicts
 
     def get_node(self, name: str) -> Optional[NodeInfo]:
         """Get a specific node by name."""
-        tag = self._node_index.get(name)
-        if not tag:
+        i = self._node_index.get(name)
+        if i is None:
             return None
-        return NodeInfo(
-            id=tag["name"],
-            name=tag["name"],
-            category=tag["category"],
-            kind=tag["kind"],
-            file=tag["rel_fname"],
-            line=tag["line"],
-            info=tag["info"],
-        )
+        return self._node_infos[i]
+
+    def get_node_dict(self, name: str) -> Optional[dict]:
+        """get_node() as a shared dict."""
+        i = self._node_index.get(name)
+        if i is None:
+            return None
+        return self._get_node_dicts()[i]
 
     def get_neighbors(self, name: str, depth: int = 1) -> list[str]:
         """
@@ -179,42 +376,30 @@ class GraphAPI:
         Returns:
             List of neighbor node names
         """
-        if not self.graph:
-            raise RuntimeError("Graph not loaded. Call load() first.")
+        self._require_loaded()
 
-        if name not in self.graph:
+        start = self._node_ids.get(name)
+        if start is None:
             return []
 
         if depth == 1:
-            return list(self.graph.neighbors(name))
-
-        # BFS for multi-hop neighbors
-        visited = set()
-        queue = [(name, 0)]
-
-        while queue:
-            node, level = queue.pop(0)
-            if node in visited:
-                continue
-            visited.add(node)
-
-            if level < depth and node in self.graph:
-                for neighbor in self.graph.neighbors(node):
-                    if neighbor not in visited:
-                        queue.append((neighbor, level + 1))
+            return self._successors(start)
 
-        visited.discard(name)  # Remove the starting node
-        return list(visited)
+        names = self._node_names
+        return [names[i] for i in _bfs(self._indptr, self._indices, start, depth)]
 
     def get_predecessors(self, name: str) -> list[str]:
         """Get nodes that reference this node."""
-        if not self.graph:
-            raise RuntimeError("Graph not loaded. Call load() first.")
+        self._require_loaded()
 
-        if name not in self.graph:
+        target = self._node_ids.get(name)
+        if target is None:
             return []
 
-        return list(self.graph.predecessors(name))
+        names = self._node_names
+        sources = self._pred_indices[self._pred_indptr[target]:self._pred_indptr[target + 1]]
+        # dict.fromkeys drops repeats from parallel edges, keeping node order
+        return [names[i] for i in dict.fromkeys(sources)]
 
     def search(self, query: str, exact: bool = False) -> list[NodeInfo]:
         """
@@ -227,19 +412,40 @@ class GraphAPI:
         Returns:
             List of matching NodeInfo objects
         """
-        results = []
-        query_lower = query.lower()
+        return [self._node_infos[i] for i in self._search_positions(query, exact)]
 
-        for tag in self.tags:
-            name = tag["name"]
-            if exact:
-                if name == query:
-                    results.append(self._tag_to_node_info(tag))
-            else:
-                if query_lower in name.lower():
-                    results.append(self._tag_to_node_info(tag))
+    def search_dicts(self, query: str, exact: bool = False) -> list[dict]:
+        """search() returning the shared node dicts."""
+        node_dicts = self._get_node_dicts()
+        return [node_dicts[i] for i in self._search_positions(query, exact)]
 
-        return results
+    def _search_positions(self, query: str, exact: bool) -> list[int]:
+        """Tag positions matching a search, in tag order."""
+        if exact:
+            indices = self._tags_by_name.get(query, [])
+        else:
+            query_lower = query.lower()
+            if len(query_lower) < 3:
+                candidates = range(len(self._lower_names))
+            else:
+                # Only names containing every trigram of the query can match
+                postings = []
+                for j in range(len(query_lower) - 2):
+                    posting = self._trigrams.get(query_lower[j:j + 3])
+                    if posting is None:
+                        return []
+                    postings.append(posting)
+                postings.sort(key=len)
+                candidates = postings[0].intersection(*postings[1:])
+
+            indices = sorted(
+                i
+                for lower_id in candidates
+                if query_lower in self._lower_names[lower_id]
+                for i in self._tags_by_lower[lower_id]
+            )
+
+        return indices
 
     def _tag_to_node_info(self, tag: dict) -> NodeInfo:
         """Convert a tag dict to NodeInfo."""
@@ -249,24 +455,22 @@ class GraphAPI:
             category=tag["category"],
             kind=tag["kind"],
             file=tag["rel_fname"],
-            line=tag["line"],
+            line=tuple(tag["line"]),
             info=tag["info"],
         )
 
     def get_files(self) -> list[str]:
         """Get list of all files in the graph."""
-        files = set()
-        for tag in self.tags:
-            files.add(tag["rel_fname"])
-        return sorted(files)
+        return self._files_sorted
 
     def get_file_nodes(self, filename: str) -> list[NodeInfo]:
         """Get all nodes in a specific file."""
-        nodes = []
-        for tag in self.tags:
-            if tag["rel_fname"] == filename:
-                nodes.append(self._tag_to_node_info(tag))
-        return nodes
+        return [self._node_infos[i] for i in self._nodes_by_file.get(filename, ())]
+
+    def get_file_node_dicts(self, filename: str) -> list[dict]:
+        """get_file_nodes() returning the shared node dicts."""
+        node_dicts = self._get_node_dicts()
+        return [node_dicts[i] for i in self._nodes_by_file.get(filename, ())]
 
     def to_json(self) -> dict:
         """
@@ -275,29 +479,44 @@ class GraphAPI:
         Returns:
             Dict with nodes, edges, and metadata
         """
-        definitions = self.get_definitions()
-        edges = self.get_edges()
+        definitions = list(self.iter_node_dicts(kind="def"))
 
         # Deduplicate nodes for visualization
         seen_nodes = set()
         unique_nodes = []
         for node in definitions:
-            if node.name not in seen_nodes:
-                seen_nodes.add(node.name)
-                unique_nodes.append(node.to_dict())
+            if node["name"] not in seen_nodes:
+                seen_nodes.add(node["name"])
+                unique_nodes.append(node)
 
         return {
             "nodes": unique_nodes,
-            "edges": [e.to_dict() for e in edges],
+            "edges": self.get_edge_dicts(),
             "files": self.get_files(),
             "stats": {
-                "total_nodes": len(self.graph.nodes) if self.graph else 0,
-                "total_edges": len(self.graph.edges) if self.graph else 0,
+                "total_nodes": len(self._node_attrs) if self._node_attrs else 0,
+                "total_edges": len(self._indices),
                 "definitions": len(definitions),
                 "files": len(self.get_files()),
             }
         }
 
+    def to_json_bytes(self) -> bytes:
+        """to_json() serialized with orjson, computed once per load."""
+        blob = self._json_cache.get("full")
+        if blob is None:
+            blob = self._json_cache["full"] = orjson.dumps(self.to_json())
+        return blob
+
+    def to_json_encoded(self) -> tuple[bytes, bytes, str]:
+        """to_json_bytes() plus its gzip encoding and a quoted content-hash ETag."""
+        encoded = self._encoded_cache.get("full")
+        if encoded is None:
+            blob = self.to_json_bytes()
+            etag = '"' + hashlib.blake2b(blob, digest_size=16).hexdigest() + '"'
+            encoded = self._encoded_cache["full"] = (blob, gzip.compress(blob, compresslevel=6), etag)
+        return encoded
+
     def to_vis_format(self, files_only: bool = False) -> dict:
         """
         Export graph in format suitable for the React frontend visualization.
@@ -312,37 +531,27 @@ class GraphAPI:
         Returns:
             Dict with nodes and edges arrays
         """
-        if not self.graph:
-            raise RuntimeError("Graph not loaded. Call load() first.")
+        self._require_loaded()
 
-        # Get nodes based on mode
+        # (name, file) pairs for the requested nodes, read straight from the loaded data
         if files_only:
             # Get file nodes directly from graph (not from tags)
-            all_nodes = []
-            for node_id, attrs in self.graph.nodes(data=True):
-                if attrs.get("category") == "file":
-                    all_nodes.append(NodeInfo(
-                        id=node_id,
-                        name=node_id,
-                        category="file",
-                        kind=attrs.get("kind", "def"),
-                        file=attrs.get("file", node_id),
-                        line=attrs.get("line", [0, 0]),
-                        info=attrs.get("info", ""),
-                    ))
+            all_nodes = (
+                (node_id, attrs.get("file", node_id))
+                for node_id, attrs in self._node_attrs.items()
+                if attrs.get("category") == "file"
+            )
         else:
-            all_nodes = self.get_definitions()
-
-        edges = self.get_edges()
+            all_nodes = ((tag["name"], tag["rel_fname"]) for tag in self.tags if tag["kind"] == "def")
 
         # Create node map with unique IDs
         node_map = {}
         nodes = []
 
-        for node in all_nodes:
-            if node.name not in node_map:
-                # Get file path - node.file should already be relative from graph_builder
-                file_path = node.file if node.file else node.name
+        for name, file in all_nodes:
+            if name not in node_map:
+                # Get file path - file should already be relative from graph_builder
+                file_path = file if file else name
 
                 # Normalize path separators to forward slashes
                 file_path = file_path.replace("\\", "/")
@@ -387,18 +596,19 @@ class GraphAPI:
 
                 # Count outgoing edges for sizing
                 out_degree = 0
-                if node.name in self.graph:
-                    out_degree = self.graph.out_degree(node.name)
+                idx = self._node_ids.get(name)
+                if idx is not None:
+                    out_degree = self._indptr[idx + 1] - self._indptr[idx]
 
-                node_map[node.name] = {
-                    "id": node.name,
+                node_map[name] = {
+                    "id": name,
                     "path": file_path,
                     "folder": folder,
                     "severity": "gray",  # Default - updated from RLM data below
                     "issues": 0,         # Default - updated from RLM data below
                     "size": max(8, min(20, 8 + out_degree)),  # Size based on connections
                 }
-                nodes.append(node_map[node.name])
+                nodes.append(node_map[name])
 
         # Load RLM analysis results if available
         repo_name = self.output_dir.name
@@ -406,8 +616,8 @@ class GraphAPI:
 
         if analysis_file.exists():
             try:
-                with open(analysis_file, 'r') as f:
-                    rlm_data = json.load(f)
+                with open(analysis_file, 'rb') as f:
+                    rlm_data = orjson.loads(f.read())
                     issues_by_file = rlm_data.get("issues_by_file", {})
 
                     # Update node severity and issues based on RLM data
@@ -420,24 +630,15 @@ class GraphAPI:
                             # Determine severity based on highest severity issue
                             # Maps RLM severities (none/low/medium/high/critical) to UI colors
                             if file_issues:
-                                has_critical = any(i.get("severity") == "critical" for i in file_issues)
-                                has_high = any(i.get("severity") == "high" for i in file_issues)
-                                has_medium = any(i.get("severity") == "medium" for i in file_issues)
-                                has_low = any(i.get("severity") == "low" for i in file_issues)
-                                all_none = all(i.get("severity") == "none" for i in file_issues)
-
-                                if all_none:
-                                    node["severity"] = "green"
-                                elif has_critical:
-                                    node["severity"] = "purple"
-                                elif has_high:
-                                    node["severity"] = "red"
-                                elif has_medium:
-                                    node["severity"] = "orange"
-                                elif has_low:
-                                    node["severity"] = "yellow"
-                                else:
-                                    node["severity"] = "yellow"
+                                rank = 0
+                                all_none = True
+                                for issue in file_issues:
+                                    severity = issue.get("severity")
+                                    if severity != "none":
+                                        all_none = False
+                                        rank = max(rank, SEVERITY_RANK.get(severity, 0))
+
+                                node["severity"] = "green" if all_none else RANK_COLORS[rank]
 
                                 # Add top issue description
                                 node["topIssue"] = file_issues[0].get("description", "")
@@ -452,16 +653,19 @@ class GraphAPI:
         # Create edges (only for nodes that exist)
         edge_list = []
         seen_edges = set()
-        for edge in edges:
-            if edge.source in node_map and edge.target in node_map:
-                # Make DAG - remove bidirectional edges
-                edge_pair = tuple(sorted([edge.source, edge.target]))
-                if edge_pair not in seen_edges:
-                    seen_edges.add(edge_pair)
-                    edge_list.append({
-                        "from": edge.source,
-                        "to": edge.target,
-                    })
+        add_seen = seen_edges.add
+        for source, target in self._iter_edges():
+            if source not in node_map or target not in node_map:
+                continue
+            # Make DAG - remove bidirectional edges
+            edge_pair = (source, target) if source < target else (target, source)
+            if edge_pair in seen_edges:
+                continue
+            add_seen(edge_pair)
+            edge_list.append({
+                "from": source,
+                "to": target,
+            })
 
         return {
             "nodes": nodes,
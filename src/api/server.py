@@ -11,9 +11,13 @@ Or:
 """
 
 import sys
-import json
 import os
 import time
+import gzip
+import itertools
+import logging
+import multiprocessing
+from collections import OrderedDict, deque
 from pathlib import Path
 
 # Disable stdout buffering for real-time logging
@@ -24,17 +28,38 @@ sys.stdout.reconfigure(line_buffering=True) if hasattr(sys.stdout, 'reconfigure'
 REPO_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(REPO_ROOT / "src"))
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, HttpUrl
-from typing import Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic.main import BaseModel
+from typing import Any, Awaitable, Callable, Iterable, Optional
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import orjson
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-from pipeline import ContextifyPipeline, AnalysisResult
+from pipeline import ContextifyPipeline, AnalysisResult, analyze_repository
 from api.graph_api import GraphAPI, load_graph
-from github_fetch import GitHubFetchError
+from github_fetch import GitHubFetchError, parse_github_url
+from graph_builder import GraphBuilder
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+logger = logging.getLogger("contextify.api")
+
+# Configured at import rather than under __main__, so `uvicorn src.api.server:app`
+# and re-imported workers also print progress; skipped if already set up
+_contextify_logger = logging.getLogger("contextify")
+if not _contextify_logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    _contextify_logger.addHandler(_log_handler)
+    _contextify_logger.setLevel(os.environ.get("CONTEXTIFY_LOG_LEVEL", "INFO").upper())
+    _contextify_logger.propagate = False
 
 # Import RLM scanner
 try:
@@ -42,13 +67,54 @@ try:
     RLM_AVAILABLE = True
 except ImportError:
     RLM_AVAILABLE = False
-    print("Warning: RLM scanner not available (missing dependencies)")
+    logger.warning("RLM scanner not available (missing dependencies)")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def orjson_response(payload: Any, headers: Optional[dict] = None) -> Response:
+    """Encode an already JSON-safe payload with orjson into a plain Response."""
+    return Response(orjson.dumps(payload), media_type="application/json", headers=headers)
+
+
+async def _stream_json_array(key: str, items: Iterable[dict], batch_size: int = 1000):
+    """Stream {"<key>": [...]} in batches so large arrays are never encoded in one piece."""
+    yield b"{" + orjson.dumps(key) + b":["
+    separator = b""
+    batch = []
+    for item in items:
+        batch.append(orjson.dumps(item))
+        if len(batch) >= batch_size:
+            yield separator + b",".join(batch)
+            separator = b","
+            batch = []
+    if batch:
+        yield separator + b",".join(batch)
+    yield b"]}"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Share the thread pool as the loop's default executor for the app's lifetime."""
+    global _main_loop
+    _main_loop = asyncio.get_running_loop()
+    _main_loop.set_default_executor(executor)
+    yield
+    process_executor.shutdown(wait=False, cancel_futures=True)
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Contextify API",
     description="Repository analysis API for AI-powered code understanding",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Enable CORS for web UI
@@ -65,19 +131,51 @@ pipeline = ContextifyPipeline()
 
 # Track analysis jobs and progress (list of events per repo, not single value)
 analysis_jobs: dict[str, dict] = {}
-analysis_events: dict[str, list[dict]] = {}
+# Only the most recent events are kept; seq numbers are global and increasing
+MAX_EVENTS_PER_REPO = 1024
+analysis_events: dict[str, deque[dict]] = {}
+_event_seq = itertools.count(1)
 
+# SSE streams waiting for new events: repo -> {(loop, event)}
+_progress_listeners: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
 
-def emit_progress(repo_name: str, data: dict):
-    """Append a progress event to the repo's event list. Thread-safe for use from callbacks."""
-    print(f"[PROGRESS] {data.get('type')}: {data}")
+
+# Loop serving requests, set on startup; all event-list mutations happen on it
+_main_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _append_event(repo_name: str, data: dict):
+    """Append a progress event to the repo's event list. Runs on the main loop only."""
     if repo_name not in analysis_events:
-        analysis_events[repo_name] = []
+        analysis_events[repo_name] = deque(maxlen=MAX_EVENTS_PER_REPO)
     analysis_events[repo_name].append({
+        "seq": next(_event_seq),
         "timestamp": time.time(),
         "data": data,
     })
 
+    # Wake any streams for this repo on their own loop
+    for loop, event in list(_progress_listeners.get(repo_name, ())):
+        loop.call_soon_threadsafe(event.set)
+
+
+def emit_progress(repo_name: str, data: dict):
+    """Record a progress event. Safe to call from any thread; the append runs on the main loop."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[PROGRESS] %s: %s", data.get("type"), data)
+    loop = _main_loop
+    if loop is None or loop.is_closed():
+        _append_event(repo_name, data)
+        return
+    try:
+        on_loop = asyncio.get_running_loop() is loop
+    except RuntimeError:
+        on_loop = False
+    if on_loop:
+        _append_event(repo_name, data)
+    else:
+        loop.call_soon_threadsafe(_append_event, repo_name, data)
+
 
 # Progress callback for RLM scanner
 def progress_callback(data: dict):
@@ -96,13 +194,108 @@ if RLM_AVAILABLE:
             repos_dir=str(pipeline.repos_dir),
             progress_callback=progress_callback
         )
-        print("✓ RLM scanner initialized with verbose logging")
+        logger.info("RLM scanner initialized")
     except Exception as e:
-        print(f"Warning: Failed to initialize RLM scanner: {e}")
+        logger.warning("Failed to initialize RLM scanner: %s", e)
         RLM_AVAILABLE = False
 
-# Thread pool for running blocking operations
-executor = ThreadPoolExecutor(max_workers=4)
+# Thread pool for running blocking operations (override size with CONTEXTIFY_POOL_SIZE)
+POOL_SIZE = int(os.environ.get("CONTEXTIFY_POOL_SIZE", max(4, min(32, (os.cpu_count() or 2) * 2))))
+executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="contextify")
+
+# Process pool for CPU-bound graph building that needs no progress callbacks
+# (override size with CONTEXTIFY_BUILD_WORKERS). Each build parses its files
+# in its own worker, so a couple of workers already keep the CPUs busy
+BUILD_WORKERS = int(os.environ.get("CONTEXTIFY_BUILD_WORKERS", 2))
+
+
+def _build_pool_context():
+    """Start build workers without forking this multi-threaded server."""
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["pipeline"])
+    return context
+
+
+process_executor = ProcessPoolExecutor(max_workers=BUILD_WORKERS, mp_context=_build_pool_context())
+
+# Loaded graphs per repo with the mtimes of the files they were loaded from,
+# least recently used first
+GRAPH_CACHE_SIZE = 16
+_graph_cache: OrderedDict[str, tuple[tuple, GraphAPI]] = OrderedDict()
+
+# Encoded /vis payloads per (repo, files_only): (etag, raw, gzipped), least recently used first
+VIS_CACHE_SIZE = 32
+_vis_cache: OrderedDict[tuple[str, bool], tuple[str, bytes, bytes]] = OrderedDict()
+
+# Running analyses by (endpoint, repo, options); identical requests share one run
+_inflight: dict[tuple, asyncio.Future] = {}
+
+# Output directories of analyzed repos; unknown names fall back to a filesystem check
+_known_repos: dict[str, Path] = {
+    name: pipeline.output_dir / name for name in pipeline.list_analyzed_repos()
+}
+
+
+async def _single_flight(key: tuple, run: Callable[[], Awaitable[Any]]) -> Any:
+    """Await the run already in flight for key, or start run() and share it with later callers."""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(run())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shielded so one client disconnecting does not cancel the run for the others
+    return await asyncio.shield(task)
+
+
+def _graph_mtimes(repo_dir: Path) -> tuple:
+    """Return the mtimes of a repo's graph files (None for missing files)."""
+    mtimes = []
+    for name in ("graph.pkl", "tags.json"):
+        try:
+            mtimes.append((repo_dir / name).stat().st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def _repo_dir(repo_name: str) -> Path:
+    """Return a repo's output directory, checking the filesystem only for unknown repos."""
+    repo_dir = _known_repos.get(repo_name)
+    if repo_dir is None:
+        repo_dir = pipeline.output_dir / repo_name
+        if not (repo_dir / "graph.pkl").exists():
+            raise FileNotFoundError(f"Graph not found: {repo_dir}")
+        _known_repos[repo_name] = repo_dir
+    return repo_dir
+
+
+async def _get_api(repo_name: str) -> GraphAPI:
+    """Return the cached GraphAPI for a repo, reloading it if its files changed on disk."""
+    repo_dir = _repo_dir(repo_name)
+    mtimes = _graph_mtimes(repo_dir)
+    # No lock for hits: the cache is only touched from the event loop thread
+    cached = _graph_cache.get(repo_name)
+    if cached is not None and cached[0] == mtimes:
+        _graph_cache.move_to_end(repo_name)
+        return cached[1]
+    # Loads are shared per repo and file version, so a slow load blocks only its own repo
+    return await _single_flight(("graph", repo_name, mtimes), lambda: _load_api(repo_name, repo_dir, mtimes))
+
+
+async def _load_api(repo_name: str, repo_dir: Path, mtimes: tuple) -> GraphAPI:
+    """Load a repo's GraphAPI off the event loop and add it to the cache."""
+    try:
+        api = await run_in_threadpool(load_graph, repo_dir)
+    except FileNotFoundError:
+        _known_repos.pop(repo_name, None)
+        raise
+    _graph_cache[repo_name] = (mtimes, api)
+    _graph_cache.move_to_end(repo_name)
+    while len(_graph_cache) > GRAPH_CACHE_SIZE:
+        _graph_cache.popitem(last=False)
+    return api
 
 
 # Request/Response models
@@ -174,6 +367,53 @@ class LocalAnalysisRequest(BaseModel):
     run_rlm: bool = True
 
 
+# Responses may be cached but must be revalidated, since a re-analysis replaces them
+CACHE_CONTROL = "private, no-cache"
+
+
+def _files_etag(*paths: Path, variant: str = "") -> str:
+    """Build an ETag from the mtime and size of the files a response is derived from."""
+    parts = []
+    for path in paths:
+        try:
+            st = path.stat()
+            parts.append(f"{st.st_mtime_ns:x}.{st.st_size:x}")
+        except OSError:
+            parts.append("0")
+    if variant:
+        parts.append(variant)
+    return '"' + "-".join(parts) + '"'
+
+
+# Raw detailed_analysis.json bytes per results path, with the mtime they were read at
+_rlm_results_cache: dict[Path, tuple[int, bytes]] = {}
+
+
+def _read_rlm_results(path: Path) -> bytes:
+    """Return the results file's bytes, re-reading (and validating) only when it changed."""
+    mtime = path.stat().st_mtime_ns
+    cached = _rlm_results_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    raw = path.read_bytes()
+    orjson.loads(raw)  # Fail here rather than serve a half-written file
+    _rlm_results_cache[path] = (mtime, raw)
+    return raw
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response if the client already holds the current representation."""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
+
+
+def _encode_vis(api: GraphAPI, files_only: bool, etag: str) -> tuple[str, bytes, bytes]:
+    """Build the vis payload once and keep it both plain and gzip-encoded."""
+    raw = orjson.dumps(api.to_vis_format(files_only=files_only))
+    return etag, raw, gzip.compress(raw, compresslevel=1)
+
+
 # API Endpoints
 
 @app.get("/")
@@ -189,8 +429,8 @@ async def list_repos():
     return {"repos": repos}
 
 
-@app.post("/analyze", response_model=AnalyzeResponse)
-async def analyze_repo(request: AnalyzeRequest, background_tasks: BackgroundTasks):
+@app.post("/analyze", responses={200: {"model": AnalyzeResponse}})
+async def analyze_repo(request: AnalyzeRequest):
     """
     Analyze a GitHub repository.
 
@@ -198,23 +438,37 @@ async def analyze_repo(request: AnalyzeRequest, background_tasks: BackgroundTask
     For large repos, the analysis runs in the background.
     """
     try:
-        # Run analysis in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
+        owner, repo = parse_github_url(request.url)
+    except GitHubFetchError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return ORJSONResponse(await _single_flight(
+        ("analyze", owner, repo, request.force), lambda: _analyze_repo(request, (owner, repo))
+    ))
+
+
+async def _analyze_repo(request: AnalyzeRequest, parsed: tuple[str, str]) -> dict:
+    try:
+        # Graph building is CPU-bound, so run it in a separate process
+        loop = asyncio.get_running_loop()
         result = await loop.run_in_executor(
-            executor,
-            lambda: pipeline.analyze(
-                request.url,
-                force_download=request.force,
-                force_analyze=request.force
-            )
+            process_executor,
+            analyze_repository,
+            request.url,
+            request.force,
+            pipeline.output_dir,
+            pipeline.repos_dir,
+            parsed,
         )
+        _known_repos[result.repo_name] = pipeline.output_dir / result.repo_name
 
-        return AnalyzeResponse(
-            repo_name=result.repo_name,
-            status="completed",
-            node_count=result.node_count,
-            edge_count=result.edge_count,
-        )
+        # Fields come from our own pipeline result, so skip constructor validation
+        return {
+            "repo_name": result.repo_name,
+            "status": "completed",
+            "node_count": result.node_count,
+            "edge_count": result.edge_count,
+            "message": None,
+        }
 
     except GitHubFetchError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -224,29 +478,68 @@ async def analyze_repo(request: AnalyzeRequest, background_tasks: BackgroundTask
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
-@app.get("/graph/{repo_name}", response_model=GraphResponse)
-async def get_graph(repo_name: str):
+# GraphResponse documents the payload only; it is not used to validate it
+@app.get("/graph/{repo_name}", responses={200: {"model": GraphResponse}})
+async def get_graph(repo_name: str, request: Request):
     """Get the full graph data for a repository."""
     try:
-        api = load_graph(pipeline.output_dir / repo_name)
-        return api.to_json()
+        api = await _get_api(repo_name)
+        blob, gzipped, etag = await run_in_threadpool(api.to_json_encoded)
+        cached = _not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(gzipped, media_type="application/json", headers=headers)
+        return Response(blob, media_type="application/json", headers=headers)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Repository not found: {repo_name}")
 
 
 @app.get("/graph/{repo_name}/vis")
-async def get_graph_vis(repo_name: str, files_only: bool = False):
+async def get_graph_vis(repo_name: str, request: Request, files_only: bool = False):
     """Get graph data in visualization-friendly format.
 
     Args:
         files_only: If true, only return file nodes (better for large repos)
     """
-    try:
-        api = load_graph(pipeline.output_dir / repo_name)
-        return api.to_vis_format(files_only=files_only)
-    except FileNotFoundError:
+    repo_dir = _known_repos.get(repo_name) or pipeline.output_dir / repo_name
+    # A missing graph would otherwise get a constant ETag and could be answered with 304
+    if not (repo_dir / "graph.pkl").exists():
         raise HTTPException(status_code=404, detail=f"Repository not found: {repo_name}")
 
+    etag = _files_etag(
+        repo_dir / "graph.pkl",
+        repo_dir / "tags.json",
+        Path("analysis") / repo_name / "detailed_analysis.json",
+        variant="files" if files_only else "all",
+    )
+    cached = _not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    key = (repo_name, files_only)
+    entry = _vis_cache.get(key)
+    if entry is None or entry[0] != etag:
+        try:
+            api = await _get_api(repo_name)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Repository not found: {repo_name}")
+        entry = await run_in_threadpool(_encode_vis, api, files_only, etag)
+        _vis_cache[key] = entry
+    _vis_cache.move_to_end(key)
+    while len(_vis_cache) > VIS_CACHE_SIZE:
+        _vis_cache.popitem(last=False)
+
+    _, raw, gzipped = entry
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(gzipped, media_type="application/json", headers=headers)
+    return Response(raw, media_type="application/json", headers=headers)
+
 
 @app.get("/graph/{repo_name}/nodes")
 async def get_nodes(
@@ -256,9 +549,12 @@ async def get_nodes(
 ):
     """Get all nodes, optionally filtered by kind or category."""
     try:
-        api = load_graph(pipeline.output_dir / repo_name)
-        nodes = api.get_nodes(kind=kind, category=category)
-        return {"nodes": [n.to_dict() for n in nodes]}
+        api = await _get_api(repo_name)
+        nodes = api.iter_node_dicts(kind=kind, category=category)
+        return StreamingResponse(
+            _stream_json_array("nodes", nodes),
+            media_type="application/json",
+        )
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Repository not found: {repo_name}")
 
@@ -267,9 +563,12 @@ async def get_nodes(
 async def get_edges(repo_name: str):
     """Get all edges in the graph."""
     try:
-        api = load_graph(pipeline.output_dir / repo_name)
-        edges = api.get_edges()
-        return {"edges": [e.to_dict() for e in edges]}
+        api = await _get_api(repo_name)
+        edges = api.get_edge_dicts()
+        return StreamingResponse(
+            _stream_json_array("edges", edges),
+            media_type="application/json",
+        )
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Repository not found: {repo_name}")
 
@@ -278,11 +577,11 @@ async def get_edges(repo_name: str):
 async def get_node(repo_name: str, node_name: str):
     """Get a specific node by name."""
     try:
-        api = load_graph(pipeline.output_dir / repo_name)
-        node = api.get_node(node_name)
+        api = await _get_api(repo_name)
+        node = api.get_node_dict(node_name)
         if not node:
             raise HTTPException(status_code=404, detail=f"Node not found: {node_name}")
-        return node.to_dict()
+        return orjson_response(node)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Repository not found: {repo_name}")
 
@@ -291,9 +590,9 @@ async def get_node(repo_name: str, node_name: str):
 async def get_neighbors(repo_name: str, node_name: str, depth: int = 1):
     """Get neighbors of a node."""
     try:
-        api = load_graph(pipeline.output_dir / repo_name)
+        api = await _get_api(repo_name)
         neighbors = api.get_neighbors(node_name, depth=depth)
-        return {"neighbors": neighbors}
+        return orjson_response({"neighbors": neighbors})
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Repository not found: {repo_name}")
 
@@ -302,9 +601,9 @@ async def get_neighbors(repo_name: str, node_name: str, depth: int = 1):
 async def search_graph(repo_name: str, request: SearchRequest):
     """Search for nodes by name."""
     try:
-        api = load_graph(pipeline.output_dir / repo_name)
-        results = api.search(request.query, exact=request.exact)
-        return {"results": [n.to_dict() for n in results]}
+        api = await _get_api(repo_name)
+        results = api.search_dicts(request.query, exact=request.exact)
+        return orjson_response({"results": results})
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Repository not found: {repo_name}")
 
@@ -313,9 +612,9 @@ async def search_graph(repo_name: str, request: SearchRequest):
 async def get_files(repo_name: str):
     """Get list of files in the repository."""
     try:
-        api = load_graph(pipeline.output_dir / repo_name)
+        api = await _get_api(repo_name)
         files = api.get_files()
-        return {"files": files}
+        return orjson_response({"files": files})
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Repository not found: {repo_name}")
 
@@ -324,9 +623,9 @@ async def get_files(repo_name: str):
 async def get_file_nodes(repo_name: str, file_path: str):
     """Get all nodes in a specific file."""
     try:
-        api = load_graph(pipeline.output_dir / repo_name)
-        nodes = api.get_file_nodes(file_path)
-        return {"nodes": [n.to_dict() for n in nodes]}
+        api = await _get_api(repo_name)
+        nodes = api.get_file_node_dicts(file_path)
+        return orjson_response({"nodes": nodes})
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Repository not found: {repo_name}")
 
@@ -334,6 +633,10 @@ async def get_file_nodes(repo_name: str, file_path: str):
 @app.delete("/graph/{repo_name}")
 async def delete_graph(repo_name: str):
     """Delete analysis data for a repository."""
+    _graph_cache.pop(repo_name, None)
+    _known_repos.pop(repo_name, None)
+    for files_only in (False, True):
+        _vis_cache.pop((repo_name, files_only), None)
     if pipeline.delete_analysis(repo_name):
         return {"status": "deleted", "repo_name": repo_name}
     raise HTTPException(status_code=404, detail=f"Repository not found: {repo_name}")
@@ -341,7 +644,7 @@ async def delete_graph(repo_name: str):
 
 # RLM Scanning Endpoints
 
-@app.post("/rlm/scan", response_model=RLMScanResponse)
+@app.post("/rlm/scan", responses={200: {"model": RLMScanResponse}})
 async def rlm_scan_repo(request: RLMScanRequest):
     """
     Perform RLM-based code analysis on a GitHub repository.
@@ -355,38 +658,43 @@ async def rlm_scan_repo(request: RLMScanRequest):
             detail="RLM scanner not available. Check OPENAI_API_KEY and dependencies."
         )
 
+    try:
+        owner, repo = parse_github_url(request.url)
+    except GitHubFetchError as e:
+        raise HTTPException(status_code=500, detail=f"RLM scan failed: {str(e)}")
+    return ORJSONResponse(await _single_flight(
+        ("rlm-scan", owner, repo, request.force), lambda: _rlm_scan_repo(request)
+    ))
+
+
+async def _rlm_scan_repo(request: RLMScanRequest) -> dict:
     try:
         # Run RLM scan in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            executor,
-            lambda: rlm_scanner.scan_github_repo(
-                request.url,
-                force_download=request.force,
-                force_analyze=request.force
-            )
+        result = await asyncio.to_thread(
+            rlm_scanner.scan_github_repo,
+            request.url,
+            force_download=request.force,
+            force_analyze=request.force,
         )
 
-        from github_fetch import parse_github_url
         _, repo_name = parse_github_url(request.url)
 
-        return RLMScanResponse(
-            repo_name=repo_name,
-            status="completed",
-            files_analyzed=result.get("files_analyzed"),
-            issues_found=result.get("issues_found"),
-            execution_time=result.get("execution_time"),
-        )
+        return {
+            "repo_name": repo_name,
+            "status": "completed",
+            "files_analyzed": result.get("files_analyzed"),
+            "issues_found": result.get("issues_found"),
+            "execution_time": result.get("execution_time"),
+            "message": None,
+        }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"RLM scan failed: {str(e)}")
 
 
 @app.get("/rlm/results/{repo_name}")
-async def get_rlm_results(repo_name: str):
+async def get_rlm_results(repo_name: str, request: Request):
     """Get RLM analysis results for a repository."""
-    from pathlib import Path
-
     results_path = Path("analysis") / repo_name / "detailed_analysis.json"
 
     if not results_path.exists():
@@ -395,10 +703,18 @@ async def get_rlm_results(repo_name: str):
             detail=f"No RLM results found for: {repo_name}"
         )
 
+    etag = _files_etag(results_path)
+    cached = _not_modified(request, etag)
+    if cached is not None:
+        return cached
+
     try:
-        with open(results_path, 'r', encoding='utf-8') as f:
-            results = json.load(f)
-        return results
+        raw = await run_in_threadpool(_read_rlm_results, results_path)
+        return Response(
+            raw,
+            media_type="application/json",
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -424,10 +740,8 @@ class FileInsightsRequest(BaseModel):
 @app.post("/rlm/insights")
 async def generate_file_insights(request: FileInsightsRequest):
     """Generate AI insights and advice for a specific file or issue."""
-    import openai
-    
     api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if openai is None or not api_key:
         raise HTTPException(status_code=503, detail="OpenAI API key not configured")
     
     # Read the file content
@@ -448,8 +762,8 @@ async def generate_file_insights(request: FileInsightsRequest):
     existing_issues = []
     if analysis_path.exists():
         try:
-            with open(analysis_path, 'r', encoding='utf-8') as f:
-                analysis_data = json.load(f)
+            with open(analysis_path, 'rb') as f:
+                analysis_data = orjson.loads(f.read())
                 normalized_path = request.file_path.replace('\\', '/')
                 existing_issues = analysis_data.get('issues_by_file', {}).get(normalized_path, [])
         except:
@@ -535,12 +849,21 @@ async def get_rlm_progress(repo_name: str):
     return {"status": "not_found", "message": "No progress data available"}
 
 
+# Most SSE frames joined into a single chunk (one socket write); each stays its own message
+SSE_BATCH_SIZE = 32
+
+
+def _sse(data: dict) -> str:
+    """Format one SSE data frame holding a single JSON object."""
+    return "data: " + orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode() + "\n\n"
+
+
 @app.get("/rlm/stream/{repo_name}")
 async def stream_rlm_progress(repo_name: str):
     """
     Server-Sent Events (SSE) stream for real-time RLM progress updates.
 
-    Uses an event list so no events are lost between polls.
+    Uses an event list so no events are lost between wake-ups.
 
     Usage (JavaScript):
         const eventSource = new EventSource(`http://localhost:8000/rlm/stream/${repoName}`);
@@ -551,36 +874,61 @@ async def stream_rlm_progress(repo_name: str):
     """
     async def event_generator():
         """Generate SSE events from progress updates"""
-        event_index = 0
-        retry_count = 0
-        max_retries = 600  # 3 minutes at 0.3s intervals
-
-        # Send initial connection event
-        yield f"data: {json.dumps({'type': 'connected', 'repo_name': repo_name})}\n\n"
-
-        while retry_count < max_retries:
-            if repo_name in analysis_events:
-                events = analysis_events[repo_name]
-
-                # Send all new events since our last index
-                while event_index < len(events):
-                    progress = events[event_index]
-                    event_index += 1
-                    retry_count = 0  # Reset retry count on new data
-
-                    # Send progress data
-                    yield f"data: {json.dumps(progress['data'])}\n\n"
-
-                    # Check if analysis is complete
-                    if progress['data'].get('type') in ['analysis_complete', 'error']:
-                        yield f"data: {json.dumps({'type': 'stream_end'})}\n\n"
-                        return
+        last_seq = 0
+        timeout = 180  # 3 minutes without new events
 
-            await asyncio.sleep(0.3)
-            retry_count += 1
+        # Register before the first read so no wake-up is missed
+        listener = (asyncio.get_running_loop(), asyncio.Event())
+        wakeup = listener[1]
+        _progress_listeners.setdefault(repo_name, set()).add(listener)
 
-        # Timeout
-        yield f"data: {json.dumps({'type': 'timeout', 'message': 'Stream timeout after 3 minutes'})}\n\n"
+        try:
+            # Send initial connection event
+            yield _sse({'type': 'connected', 'repo_name': repo_name})
+
+            while True:
+                # Cleared before reading, so events appended meanwhile set it again
+                wakeup.clear()
+
+                if repo_name in analysis_events:
+                    # Copy first: events may be appended while this generator is suspended
+                    events = list(analysis_events[repo_name])
+
+                    # Send all new events since the last one we sent, several frames per write
+                    frames = []
+                    for progress in events:
+                        if progress["seq"] <= last_seq:
+                            continue
+                        last_seq = progress["seq"]
+
+                        # Send progress data
+                        frames.append(_sse(progress['data']))
+
+                        # Check if analysis is complete
+                        if progress['data'].get('type') in ['analysis_complete', 'error']:
+                            frames.append(_sse({'type': 'stream_end'}))
+                            yield "".join(frames)
+                            return
+
+                        if len(frames) >= SSE_BATCH_SIZE:
+                            yield "".join(frames)
+                            frames = []
+                    if frames:
+                        yield "".join(frames)
+
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            # Timeout
+            yield _sse({'type': 'timeout', 'message': 'Stream timeout after 3 minutes'})
+        finally:
+            listeners = _progress_listeners.get(repo_name)
+            if listeners is not None:
+                listeners.discard(listener)
+                if not listeners:
+                    del _progress_listeners[repo_name]
 
     return StreamingResponse(
         event_generator(),
@@ -593,7 +941,7 @@ async def stream_rlm_progress(repo_name: str):
     )
 
 
-@app.post("/analyze-full", response_model=FullAnalysisResponse)
+@app.post("/analyze-full", responses={200: {"model": FullAnalysisResponse}})
 async def analyze_full(request: FullAnalysisRequest):
     """
     Complete analysis: Clone GitHub repo, build graph, and optionally run RLM scan.
@@ -611,22 +959,26 @@ async def analyze_full(request: FullAnalysisRequest):
     }
     """
     try:
-        from github_fetch import parse_github_url
+        owner, repo = parse_github_url(request.url)
+    except GitHubFetchError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return ORJSONResponse(await _single_flight(
+        ("analyze-full", owner, repo, request.force, request.run_rlm),
+        lambda: _analyze_full(request, (owner, repo)),
+    ))
 
-        # Parse repo info
-        owner, repo_name = parse_github_url(request.url)
+
+async def _analyze_full(request: FullAnalysisRequest, parsed: tuple[str, str]) -> dict:
+    try:
+        owner, repo_name = parsed
 
         # Clear previous events for a fresh run
-        analysis_events[repo_name] = []
+        analysis_events[repo_name] = deque(maxlen=MAX_EVENTS_PER_REPO)
 
-        print(f"\n{'='*70}")
-        print(f"FULL ANALYSIS: {owner}/{repo_name}")
-        print(f"{'='*70}")
+        logger.info("FULL ANALYSIS: %s/%s", owner, repo_name)
 
         # Step 1: Build graph
-        import sys
-        print(f"\n[1/2] Building code graph for {owner}/{repo_name}...", flush=True)
-        sys.stdout.flush()
+        logger.info("[1/2] Building code graph for %s/%s", owner, repo_name)
 
         emit_progress(repo_name, {
             "type": "graph_building",
@@ -634,14 +986,12 @@ async def analyze_full(request: FullAnalysisRequest):
             "status": "Building code graph..."
         })
 
-        loop = asyncio.get_event_loop()
-        graph_result = await loop.run_in_executor(
-            executor,
-            lambda: pipeline.analyze(
-                request.url,
-                force_download=request.force,
-                force_analyze=request.force
-            )
+        graph_result = await asyncio.to_thread(
+            pipeline.analyze,
+            request.url,
+            force_download=request.force,
+            force_analyze=request.force,
+            parsed=parsed,
         )
 
         graph_analysis = {
@@ -651,8 +1001,7 @@ async def analyze_full(request: FullAnalysisRequest):
             "repo_path": str(graph_result.repo_path),
         }
 
-        print(f"✓ Graph built: {graph_result.node_count} nodes, {graph_result.edge_count} edges", flush=True)
-        sys.stdout.flush()
+        logger.info("Graph built: %d nodes, %d edges", graph_result.node_count, graph_result.edge_count)
 
         emit_progress(repo_name, {
             "type": "graph_complete",
@@ -665,9 +1014,7 @@ async def analyze_full(request: FullAnalysisRequest):
         rlm_analysis = None
         if request.run_rlm:
             if RLM_AVAILABLE and rlm_scanner:
-                print(f"\n[2/2] Running RLM analysis on {repo_name}...", flush=True)
-                print(f"      This may take several minutes depending on repository size", flush=True)
-                sys.stdout.flush()
+                logger.info("[2/2] Running RLM analysis on %s (may take several minutes)", repo_name)
 
                 emit_progress(repo_name, {
                     "type": "rlm_started",
@@ -676,13 +1023,11 @@ async def analyze_full(request: FullAnalysisRequest):
                 })
 
                 # Call scan_repository directly since we already built the graph
-                rlm_result = await loop.run_in_executor(
-                    executor,
-                    lambda: rlm_scanner.scan_repository(
-                        str(graph_result.repo_path),
-                        repo_name=repo_name,
-                        skip_graph_building=True
-                    )
+                rlm_result = await asyncio.to_thread(
+                    rlm_scanner.scan_repository,
+                    str(graph_result.repo_path),
+                    repo_name=repo_name,
+                    skip_graph_building=True,
                 )
 
                 rlm_analysis = {
@@ -691,8 +1036,10 @@ async def analyze_full(request: FullAnalysisRequest):
                     "execution_time": rlm_result.get("execution_time"),
                 }
 
-                print(f"✓ RLM complete: {rlm_result.get('issues_found')} issues found in {rlm_result.get('execution_time', 0):.2f}s", flush=True)
-                sys.stdout.flush()
+                logger.info(
+                    "RLM complete: %s issues found in %.2fs",
+                    rlm_result.get("issues_found"), rlm_result.get("execution_time", 0),
+                )
 
                 emit_progress(repo_name, {
                     "type": "analysis_complete",
@@ -702,16 +1049,15 @@ async def analyze_full(request: FullAnalysisRequest):
                     "execution_time": rlm_result.get("execution_time")
                 })
             else:
-                print("\n[2/2] Skipping RLM (not available)", flush=True)
-                sys.stdout.flush()
+                logger.info("[2/2] Skipping RLM (not available)")
                 rlm_analysis = {"error": "RLM scanner not available"}
 
-        return FullAnalysisResponse(
-            repo_name=repo_name,
-            status="completed",
-            graph_analysis=graph_analysis,
-            rlm_analysis=rlm_analysis
-        )
+        return {
+            "repo_name": repo_name,
+            "status": "completed",
+            "graph_analysis": graph_analysis,
+            "rlm_analysis": rlm_analysis,
+        }
 
     except GitHubFetchError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -721,7 +1067,7 @@ async def analyze_full(request: FullAnalysisRequest):
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
-@app.post("/analyze-local", response_model=FullAnalysisResponse)
+@app.post("/analyze-local", responses={200: {"model": FullAnalysisResponse}})
 async def analyze_local(request: LocalAnalysisRequest):
     """
     Analyze a local repository from the repos/ directory.
@@ -738,6 +1084,13 @@ async def analyze_local(request: LocalAnalysisRequest):
         "run_rlm": true
     }
     """
+    return ORJSONResponse(await _single_flight(
+        ("analyze-local", request.repo_name, request.force, request.run_rlm),
+        lambda: _analyze_local(request),
+    ))
+
+
+async def _analyze_local(request: LocalAnalysisRequest) -> dict:
     try:
         repo_name = request.repo_name
         repo_path = pipeline.repos_dir / repo_name
@@ -746,18 +1099,12 @@ async def analyze_local(request: LocalAnalysisRequest):
             raise HTTPException(status_code=404, detail=f"Local repository not found: {repo_name}")
 
         # Clear previous events for a fresh run
-        analysis_events[repo_name] = []
+        analysis_events[repo_name] = deque(maxlen=MAX_EVENTS_PER_REPO)
 
-        print(f"\n{'='*70}")
-        print(f"LOCAL ANALYSIS: {repo_name}")
-        print(f"{'='*70}")
+        logger.info("LOCAL ANALYSIS: %s", repo_name)
 
         # Step 1: Build graph
-        import sys
-        from graph_builder import GraphBuilder
-
-        print(f"\n[1/2] Building code graph for {repo_name}...", flush=True)
-        sys.stdout.flush()
+        logger.info("[1/2] Building code graph for %s", repo_name)
 
         emit_progress(repo_name, {
             "type": "graph_building",
@@ -765,8 +1112,6 @@ async def analyze_local(request: LocalAnalysisRequest):
             "status": "Building code graph..."
         })
 
-        loop = asyncio.get_event_loop()
-
         def build_graph():
             builder = GraphBuilder(str(repo_path))
             graph = builder.build()
@@ -783,7 +1128,7 @@ async def analyze_local(request: LocalAnalysisRequest):
                 "stats": stats
             }
 
-        graph_result = await loop.run_in_executor(executor, build_graph)
+        graph_result = await asyncio.to_thread(build_graph)
 
         graph_analysis = {
             "repo_name": repo_name,
@@ -792,8 +1137,7 @@ async def analyze_local(request: LocalAnalysisRequest):
             "repo_path": str(repo_path),
         }
 
-        print(f"[OK] Graph built: {graph_result['node_count']} nodes, {graph_result['edge_count']} edges", flush=True)
-        sys.stdout.flush()
+        logger.info("Graph built: %d nodes, %d edges", graph_result["node_count"], graph_result["edge_count"])
 
         emit_progress(repo_name, {
             "type": "graph_complete",
@@ -807,9 +1151,7 @@ async def analyze_local(request: LocalAnalysisRequest):
         rlm_analysis = None
         if request.run_rlm:
             if RLM_AVAILABLE and rlm_scanner:
-                print(f"\n[2/2] Running RLM analysis on {repo_name}...", flush=True)
-                print(f"      This may take several minutes depending on repository size", flush=True)
-                sys.stdout.flush()
+                logger.info("[2/2] Running RLM analysis on %s (may take several minutes)", repo_name)
 
                 emit_progress(repo_name, {
                     "type": "rlm_started",
@@ -817,13 +1159,11 @@ async def analyze_local(request: LocalAnalysisRequest):
                     "status": "Starting RLM analysis..."
                 })
 
-                rlm_result = await loop.run_in_executor(
-                    executor,
-                    lambda: rlm_scanner.scan_repository(
-                        str(repo_path),
-                        repo_name=repo_name,
-                        skip_graph_building=True
-                    )
+                rlm_result = await asyncio.to_thread(
+                    rlm_scanner.scan_repository,
+                    str(repo_path),
+                    repo_name=repo_name,
+                    skip_graph_building=True,
                 )
 
                 rlm_analysis = {
@@ -832,8 +1172,10 @@ async def analyze_local(request: LocalAnalysisRequest):
                     "execution_time": rlm_result.get("execution_time"),
                 }
 
-                print(f"[OK] RLM complete: {rlm_result.get('total_issues')} issues found in {rlm_result.get('execution_time', 0):.2f}s", flush=True)
-                sys.stdout.flush()
+                logger.info(
+                    "RLM complete: %s issues found in %.2fs",
+                    rlm_result.get("total_issues"), rlm_result.get("execution_time", 0),
+                )
 
                 emit_progress(repo_name, {
                     "type": "analysis_complete",
@@ -843,22 +1185,39 @@ async def analyze_local(request: LocalAnalysisRequest):
                     "execution_time": rlm_result.get("execution_time")
                 })
             else:
-                print("\n[2/2] Skipping RLM (not available)", flush=True)
-                sys.stdout.flush()
+                logger.info("[2/2] Skipping RLM (not available)")
                 rlm_analysis = {"error": "RLM scanner not available"}
 
-        return FullAnalysisResponse(
-            repo_name=repo_name,
-            status="completed",
-            graph_analysis=graph_analysis,
-            rlm_analysis=rlm_analysis
-        )
+        return {
+            "repo_name": repo_name,
+            "status": "completed",
+            "graph_analysis": graph_analysis,
+            "rlm_analysis": rlm_analysis,
+        }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
 # Run with: python -m src.api.server
+# uvloop and httptools are picked up automatically when installed (uvicorn[standard]).
+# Progress events and caches live in process memory, so keep one worker unless
+# CONTEXTIFY_WORKERS is set deliberately.
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    logging.basicConfig(
+        level=os.environ.get("CONTEXTIFY_LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    workers = int(os.environ.get("CONTEXTIFY_WORKERS", 1))
+    uvicorn.run(
+        # Multiple workers need an import string to re-import the app in each process
+        "src.api.server:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        workers=workers,
+        log_level="warning",
+        access_log=False,
+    )
@@ -6,10 +6,17 @@ Downloads public GitHub repositories for analysis by RepoGraph.
 
 import requests
 import zipfile
-import io
+import os
+import re
 import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from urllib.parse import urlparse
+from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class GitHubFetchError(Exception):
@@ -17,6 +24,32 @@ class GitHubFetchError(Exception):
     pass
 
 
+# Shared session so the API call, archive download and branch fallback reuse
+# pooled keep-alive connections; transient gateway errors are retried. Rate
+# limits (429) are left to _rate_limit_wait, which caps how long it sleeps.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+))
+_SESSION.headers.update({"Accept-Encoding": "gzip", "User-Agent": "contextify"})
+
+
+def close_session():
+    """Close pooled connections held by the shared session."""
+    _SESSION.close()
+
+
+# Optional scheme+host or bare "github.com" prefix, then owner, repo and the rest
+_GITHUB_URL_RE = re.compile(
+    r"^(?:[A-Za-z][A-Za-z0-9+.-]*://[^/?#]*|github\.com(?=/|$))?/*"
+    r"([^/?#]*)(?:/([^/?#]*))?(.*)$",
+    re.DOTALL,
+)
+
+
+@lru_cache(maxsize=1024)
 def parse_github_url(url: str) -> tuple[str, str]:
     """
     Parse a GitHub URL into (owner, repo).
@@ -38,24 +71,13 @@ def parse_github_url(url: str) -> tuple[str, str]:
     """
     url = url.strip().rstrip("/")
 
-    # Remove protocol if present
-    if "://" in url:
-        parsed = urlparse(url)
-        path = parsed.path.strip("/")
-    elif url.startswith("github.com"):
-        path = url.replace("github.com/", "")
-    else:
-        # Assume it's owner/repo format
-        path = url
-
-    # Remove .git suffix if present
-    path = path.removesuffix(".git")
-
-    parts = path.split("/")
-    if len(parts) < 2:
+    owner, repo, rest = _GITHUB_URL_RE.match(url).groups()
+    if repo is None:
         raise GitHubFetchError(f"Invalid GitHub URL format: {url}")
 
-    owner, repo = parts[0], parts[1]
+    # Remove .git suffix if the repo is the last path segment
+    if not rest.startswith("/"):
+        repo = repo.removesuffix(".git")
 
     if not owner or not repo:
         raise GitHubFetchError(f"Could not parse owner/repo from: {url}")
@@ -101,27 +123,45 @@ def fetch_github_repo(
     url = f"https://github.com/{owner}/{repo}/archive/refs/heads/{branch}.zip"
 
     try:
-        response = requests.get(url, timeout=60)
-
-        if response.status_code == 404:
-            # Try 'master' branch if 'main' fails
-            if branch == "main":
+        if branch == "main":
+            # Cheap probe so repos on 'master' skip a failed archive download
+            probe = _SESSION.head(url, allow_redirects=True, timeout=10)
+            if probe.status_code == 404:
                 return fetch_github_repo(owner, repo, "master", dest, force)
-            raise GitHubFetchError(
-                f"Repository not found: {owner}/{repo} (branch: {branch})"
-            )
 
-        response.raise_for_status()
+        with _SESSION.get(url, stream=True, timeout=60) as response:
+            if response.status_code == 404:
+                # Try 'master' branch if 'main' fails
+                if branch == "main":
+                    return fetch_github_repo(owner, repo, "master", dest, force)
+                raise GitHubFetchError(
+                    f"Repository not found: {owner}/{repo} (branch: {branch})"
+                )
+
+            response.raise_for_status()
+
+            # Spool the archive to disk so it is never held in memory
+            with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
+                archive_path = tmp.name
+                try:
+                    for chunk in response.iter_content(chunk_size=1 << 20):
+                        tmp.write(chunk)
+                except BaseException:
+                    tmp.close()
+                    os.unlink(archive_path)
+                    raise
 
     except requests.RequestException as e:
         raise GitHubFetchError(f"Failed to download repository: {e}")
 
     # Extract the zip
     try:
-        with zipfile.ZipFile(io.BytesIO(response.content)) as z:
+        with zipfile.ZipFile(archive_path) as z:
             z.extractall(dest_path)
     except zipfile.BadZipFile as e:
         raise GitHubFetchError(f"Invalid zip file received: {e}")
+    finally:
+        os.unlink(archive_path)
 
     # Rename from repo-branch to just repo
     extracted_name = f"{repo}-{branch}"
@@ -162,42 +202,184 @@ def fetch_from_url(
     return fetch_github_repo(owner, repo, dest=dest, force=force)
 
 
-def get_repo_info(owner: str, repo: str) -> dict:
+def fetch_from_urls(
+    urls: list[str],
+    dest: str | Path = "./repos",
+    force: bool = False,
+    max_workers: int = 8
+) -> dict[str, Path | GitHubFetchError]:
+    """
+    Fetch several repos concurrently over the shared session.
+
+    Downloads are network-bound, so threads overlap their waits; URLs
+    naming the same owner/repo are fetched once.
+
+    Args:
+        urls: GitHub repository URLs
+        dest: Destination directory
+        force: If True, overwrite existing downloads
+        max_workers: Maximum concurrent downloads
+
+    Returns:
+        Mapping of each URL to its extracted path, or to the
+        GitHubFetchError raised for it
+    """
+    results: dict[str, Path | GitHubFetchError] = {}
+    urls_by_repo: dict[tuple[str, str], list[str]] = {}
+    for url in urls:
+        try:
+            urls_by_repo.setdefault(parse_github_url(url), []).append(url)
+        except GitHubFetchError as e:
+            results[url] = e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(fetch_github_repo, owner, repo, dest=dest, force=force): (owner, repo)
+            for owner, repo in urls_by_repo
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except GitHubFetchError as e:
+                result = e
+            for url in urls_by_repo[futures[future]]:
+                results[url] = result
+
+    return results
+
+
+# Rate-limited API calls are retried this many times, waiting at most
+# MAX_RATE_LIMIT_WAIT seconds each; longer waits fall back immediately
+RATE_LIMIT_RETRIES = 3
+MAX_RATE_LIMIT_WAIT = 60
+
+
+def _rate_limit_wait(response: requests.Response, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying a rate-limited response, or None if it was not rate limited."""
+    if response.status_code not in (403, 429):
+        return None
+
+    headers = response.headers
+    retry_after = headers.get("Retry-After")
+    remaining = headers.get("X-RateLimit-Remaining")
+    if response.status_code == 403 and retry_after is None and remaining != "0":
+        # A plain permission error, not a rate limit
+        return None
+
+    try:
+        if retry_after is not None:
+            wait = float(retry_after)
+        elif remaining == "0" and "X-RateLimit-Reset" in headers:
+            wait = int(headers["X-RateLimit-Reset"]) - time.time()
+        else:
+            wait = 2 ** attempt
+    except ValueError:
+        wait = 2 ** attempt
+    return max(wait, 1.0)
+
+
+def _request_repo_info(owner: str, repo: str, token: Optional[str], etag: Optional[str] = None) -> requests.Response:
+    """GET the repo from the API, retrying rate limits; a 304 is returned as is."""
+    url = f"https://api.github.com/repos/{owner}/{repo}"
+    headers = {}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    if etag:
+        headers["If-None-Match"] = etag
+
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        response = _SESSION.get(url, headers=headers, timeout=30)
+        wait = _rate_limit_wait(response, attempt)
+        if wait is None or wait > MAX_RATE_LIMIT_WAIT or attempt == RATE_LIMIT_RETRIES:
+            break
+        time.sleep(wait)
+    response.raise_for_status()
+    return response
+
+
+def _repo_info_from_response(response: requests.Response) -> dict:
+    data = response.json()
+    return {
+        "name": data.get("name"),
+        "full_name": data.get("full_name"),
+        "description": data.get("description"),
+        "default_branch": data.get("default_branch", "main"),
+        "language": data.get("language"),
+        "stars": data.get("stargazers_count"),
+        "forks": data.get("forks_count"),
+        "size": data.get("size"),  # in KB
+        "html_url": data.get("html_url"),
+    }
+
+
+def minimal_repo_info(owner: str, repo: str) -> dict:
+    """Minimal info used when the API can't be reached."""
+    return {
+        "name": repo,
+        "full_name": f"{owner}/{repo}",
+        "default_branch": "main",
+    }
+
+
+@lru_cache(maxsize=1024)
+def _fetch_repo_info(owner: str, repo: str, token: Optional[str]) -> dict:
+    """Fetch repo info from the API; only successful lookups are cached."""
+    return _repo_info_from_response(_request_repo_info(owner, repo, token))
+
+
+def get_repo_info(owner: str, repo: str, token: Optional[str] = None) -> dict:
     """
     Get basic information about a GitHub repository.
 
+    Successful lookups are cached for the life of the process.
+
     Args:
         owner: Repository owner
         repo: Repository name
+        token: GitHub token for a higher rate limit (defaults to $GITHUB_TOKEN)
 
     Returns:
         Dictionary with repo info (name, description, default_branch, etc.)
     """
-    url = f"https://api.github.com/repos/{owner}/{repo}"
-
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-
-        return {
-            "name": data.get("name"),
-            "full_name": data.get("full_name"),
-            "description": data.get("description"),
-            "default_branch": data.get("default_branch", "main"),
-            "language": data.get("language"),
-            "stars": data.get("stargazers_count"),
-            "forks": data.get("forks_count"),
-            "size": data.get("size"),  # in KB
-            "html_url": data.get("html_url"),
-        }
+        # Copy so callers can't modify the cached entry
+        return dict(_fetch_repo_info(owner, repo, token or os.environ.get("GITHUB_TOKEN")))
     except requests.RequestException:
         # Return minimal info if API fails (rate limiting, etc.)
-        return {
-            "name": repo,
-            "full_name": f"{owner}/{repo}",
-            "default_branch": "main",
-        }
+        return minimal_repo_info(owner, repo)
+
+
+def get_repo_info_if_changed(
+    owner: str,
+    repo: str,
+    etag: Optional[str],
+    token: Optional[str] = None
+) -> tuple[Optional[dict], Optional[str]]:
+    """
+    Get repository info unless it is unchanged since a previous response.
+
+    Sends etag as If-None-Match; GitHub answers 304 Not Modified without a
+    body, and such responses don't count against the rate limit.
+
+    Args:
+        owner: Repository owner
+        repo: Repository name
+        etag: ETag of the previously fetched info, if any
+        token: GitHub token for a higher rate limit (defaults to $GITHUB_TOKEN)
+
+    Returns:
+        Tuple of (repo info, ETag); the info is None if it is unchanged
+
+    Raises:
+        GitHubFetchError: If the API request fails
+    """
+    try:
+        response = _request_repo_info(owner, repo, token or os.environ.get("GITHUB_TOKEN"), etag)
+        if response.status_code == 304:
+            return None, etag
+        return _repo_info_from_response(response), response.headers.get("ETag")
+    except requests.RequestException as e:
+        raise GitHubFetchError(f"Failed to get repository info: {e}")
 
 
 if __name__ == "__main__":
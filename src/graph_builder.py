@@ -6,15 +6,23 @@ Uses regex-based parsing for broad language support without heavy dependencies.
 """
 
 import ast
-import json
+import hashlib
+import multiprocessing
+import os
 import pickle
 import re
 import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from itertools import accumulate
 from pathlib import Path
 from collections import defaultdict
 from dataclasses import dataclass, asdict
 from typing import Optional
 import networkx as nx
+import orjson
 
 
 # Supported file extensions and their language mappings
@@ -67,6 +75,26 @@ LANGUAGE_EXTENSIONS = {
     ".xml": "xml",
 }
 
+SOURCE_EXTENSIONS = frozenset(LANGUAGE_EXTENSIONS)
+
+
+def _source_suffix(name: str) -> Optional[str]:
+    """Lowercased suffix of a file name if it is a supported source file (same rule as Path.suffix)."""
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        suffix = name[i:].lower()
+        if suffix in SOURCE_EXTENSIONS:
+            return suffix
+    return None
+
+
+# Directories never descended into
+SKIP_DIRS = frozenset({
+    "node_modules", ".git", "__pycache__", ".venv", "venv",
+    "dist", "build", ".next", ".nuxt", "target", "bin", "obj",
+    ".idea", ".vscode", "coverage", ".pytest_cache"
+})
+
 # Regex patterns for extracting definitions by language
 DEFINITION_PATTERNS = {
     "python": {
@@ -174,7 +202,42 @@ IMPORT_PATTERNS = {
 }
 
 
-@dataclass
+def _normalize_category(category: str) -> str:
+    """Map a pattern name to its node category (const_func -> function)."""
+    norm_category = category.split("_")[0]
+    if norm_category in ("const", "method"):
+        norm_category = "function"
+    return norm_category
+
+
+# One alternation per language with a named group per pattern, so each line is
+# matched by a single regex call; earlier patterns still win, as alternatives are
+# tried in order. Every pattern has exactly one capture group, the name.
+DEFINITION_REGEXES = {
+    language: re.compile("|".join(f"(?P<{category}>{pattern})" for category, pattern in patterns.items()))
+    for language, patterns in DEFINITION_PATTERNS.items()
+}
+DEFINITION_CATEGORIES = {
+    category: _normalize_category(category)
+    for patterns in DEFINITION_PATTERNS.values()
+    for category in patterns
+}
+IMPORT_REGEXES = {
+    language: [re.compile(pattern) for pattern in patterns]
+    for language, patterns in IMPORT_PATTERNS.items()
+}
+
+# Everything per-file parsing needs, keyed by lowercased suffix:
+# (language, definition regex or None, import regexes)
+SUFFIX_DISPATCH = {
+    ext: (language, DEFINITION_REGEXES.get(language), IMPORT_REGEXES.get(language, []))
+    for ext, language in LANGUAGE_EXTENSIONS.items()
+}
+_UNKNOWN_DISPATCH = ("unknown", None, [])
+
+
+# Slotted: one instance per definition, kept for tags.json and shipped back from workers
+@dataclass(slots=True)
 class CodeNode:
     """Represents a code element (function, class, or file)."""
     name: str
@@ -190,6 +253,98 @@ class CodeNode:
     def to_dict(self) -> dict:
         return asdict(self)
 
+    def to_tag(self) -> dict:
+        """Record written to tags.json for this node."""
+        return {
+            "fname": self.file,
+            "rel_fname": self.rel_file,
+            "line": [self.start_line, self.end_line],
+            "name": self.name,
+            "kind": self.kind,
+            "category": self.category,
+            "language": self.language,
+            "info": self.info,
+        }
+
+# Nodes found in one file, each with the node it hangs off (None for the file node)
+ParsedNodes = list[tuple[CodeNode, Optional[str]]]
+# Parsed output of one file: its nodes and the raw import paths it references
+ParsedFile = tuple[ParsedNodes, list[str]]
+
+# Below this many files, starting worker processes costs more than it saves
+PARALLEL_MIN_FILES = 64
+
+# Default cap on parse worker processes; past this, workers mostly contend for disk
+MAX_PARSE_WORKERS = 8
+
+
+def _parse_pool_context():
+    """
+    Start method for parse worker processes.
+
+    forkserver where the platform has it, so workers aren't forked from a
+    multi-threaded caller such as the API server; it preloads only this
+    module, not the caller's __main__.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return None
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+def _parse_file_worker(repo_path: Path, file_path: Path) -> Optional[ParsedFile]:
+    """Process-pool entry point for GraphBuilder._parse_file()."""
+    return GraphBuilder(repo_path)._parse_file(file_path)
+
+
+class _ImportResolver:
+    """
+    Resolves import paths to repo files by substring match against file_map keys.
+
+    An import resolves to the first key, in file_map order, that contains one of
+    its candidate forms. The keys are joined into one string so each candidate is
+    a single str.find() instead of a loop over the map, and results are cached
+    per import path since the same modules are imported all over a repo.
+    """
+
+    def __init__(self, file_map: dict[str, Path], repo_path: Path):
+        # NUL never occurs in paths, so a hit can never span two keys
+        self._keys = "\0".join(file_map)
+        self._key_starts = list(accumulate((len(key) + 1 for key in file_map), initial=0))
+        self._targets = [str(path.relative_to(repo_path)).replace("\\", "/") for path in file_map.values()]
+        self._resolved: dict[str, Optional[str]] = {}
+
+    def resolve(self, import_path: str) -> Optional[str]:
+        """Return the repo file (forward-slash relative path) an import refers to, if any."""
+        try:
+            return self._resolved[import_path]
+        except KeyError:
+            pass
+
+        # Clean up import path
+        cleaned = import_path.strip("./").replace("\\", "/")
+
+        # Try various ways to resolve the import
+        candidates = [
+            cleaned,
+            cleaned.replace(".", "/"),
+            cleaned.split(".")[-1],
+            cleaned.split("/")[-1],
+        ]
+
+        to_file = None
+        for candidate in candidates:
+            if "\0" in candidate:
+                continue
+            pos = self._keys.find(candidate)
+            if pos != -1:
+                to_file = self._targets[bisect_right(self._key_starts, pos) - 1]
+                break
+
+        self._resolved[import_path] = to_file
+        return to_file
+
 
 class GraphBuilder:
     """
@@ -198,8 +353,14 @@ class GraphBuilder:
     Supports multiple programming languages using regex-based parsing.
     """
 
-    def __init__(self, repo_path: str | Path):
+    def __init__(self, repo_path: str | Path, max_workers: Optional[int] = None):
+        """
+        Args:
+            repo_path: Repository to build the graph for
+            max_workers: Cap on parse worker processes (defaults to the CPU count, at most MAX_PARSE_WORKERS)
+        """
         self.repo_path = Path(repo_path)
+        self.max_workers = max_workers
         self.nodes: list[CodeNode] = []
         self.graph: Optional[nx.DiGraph] = None
 
@@ -220,34 +381,58 @@ class GraphBuilder:
         # Build file map for resolving imports
         file_map = self._build_file_map(all_files)
 
-        # Parse each file
-        for file_path in all_files:
-            self._parse_file(file_path, file_map)
+        # Parse files (in parallel for larger repos), then merge in file order
+        parsed_files = [parsed for parsed in self._parse_files(all_files) if parsed is not None]
+        for nodes, _ in parsed_files:
+            self._add_parsed(nodes)
 
-        # Build edges from imports
-        self._build_import_edges(all_files, file_map)
+        # Build edges from imports once every file node exists
+        resolver = _ImportResolver(file_map, self.repo_path)
+        for nodes, imports in parsed_files:
+            from_file = nodes[0][0].name
+            for import_path in imports:
+                self._add_import_edge(from_file, import_path, resolver)
 
         return self.graph
 
+    def source_fingerprint(self) -> str:
+        """
+        Hash the path, size and mtime of each file build() would parse.
+
+        Only stats the files, so it is cheap enough for the cache-hit path;
+        equal fingerprints mean a saved graph is still current for this repo.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for file_path in self._find_source_files():
+            try:
+                st = file_path.stat()
+            except OSError:
+                continue
+            digest.update(file_path.relative_to(self.repo_path).as_posix().encode("utf-8", "surrogateescape"))
+            digest.update(st.st_size.to_bytes(8, "little"))
+            digest.update(st.st_mtime_ns.to_bytes(8, "little", signed=True))
+        return digest.hexdigest()
+
     def _find_source_files(self) -> list[Path]:
         """Find all supported source files in the repository."""
         files = []
 
-        # Directories to skip
-        skip_dirs = {
-            "node_modules", ".git", "__pycache__", ".venv", "venv",
-            "dist", "build", ".next", ".nuxt", "target", "bin", "obj",
-            ".idea", ".vscode", "coverage", ".pytest_cache"
-        }
-
-        for file_path in self.repo_path.rglob("*"):
-            if file_path.is_file():
-                # Skip files in excluded directories
-                if any(skip in file_path.parts for skip in skip_dirs):
-                    continue
-
-                if file_path.suffix.lower() in LANGUAGE_EXTENSIONS:
-                    files.append(file_path)
+        # Depth-first with each directory's files before its subdirectories (rglob's
+        # order); skipped directories are pruned without being listed
+        stack = [str(self.repo_path)]
+        while stack:
+            subdirs = []
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SKIP_DIRS:
+                                subdirs.append(entry.path)
+                        elif _source_suffix(entry.name) and entry.is_file():
+                            files.append(Path(entry.path))
+            except OSError:
+                continue
+            stack.extend(reversed(subdirs))
 
         return files
 
@@ -268,34 +453,48 @@ class GraphBuilder:
 
     def _get_language(self, file_path: Path) -> str:
         """Get the language for a file."""
-        return LANGUAGE_EXTENSIONS.get(file_path.suffix.lower(), "unknown")
-
-    def _parse_file(self, file_path: Path, file_map: dict):
-        """Parse a source file and extract definitions."""
-        language = self._get_language(file_path)
+        return SUFFIX_DISPATCH.get(file_path.suffix.lower(), _UNKNOWN_DISPATCH)[0]
+
+    def _parse_files(self, files: list[Path]) -> list[Optional[ParsedFile]]:
+        """
+        Parse every file, using worker processes when there are enough files.
+
+        Already inside a worker process (e.g. the API server's build pool),
+        files are parsed in that process rather than fanning out again.
+        """
+        workers = self.max_workers or min(os.cpu_count() or 1, MAX_PARSE_WORKERS)
+        if multiprocessing.parent_process() is not None:
+            workers = 1
+        if len(files) >= PARALLEL_MIN_FILES and workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=_parse_pool_context()) as pool:
+                    return list(pool.map(
+                        partial(_parse_file_worker, self.repo_path),
+                        files,
+                        chunksize=max(1, min(32, len(files) // (workers * 4))),
+                    ))
+            except (OSError, BrokenProcessPool) as e:
+                print(f"   Parallel parsing unavailable ({e}), parsing sequentially")
+        return [self._parse_file(file_path) for file_path in files]
+
+    def _parse_file(self, file_path: Path) -> Optional[ParsedFile]:
+        """Read a source file once and extract its definitions and imports, without touching the graph."""
+        language, definition_regex, import_regexes = SUFFIX_DISPATCH.get(
+            file_path.suffix.lower(), _UNKNOWN_DISPATCH
+        )
 
         try:
             code = file_path.read_text(encoding="utf-8", errors="ignore")
         except Exception as e:
             print(f"  Skipping {file_path}: {e}")
-            return
+            return None
 
         rel_path = str(file_path.relative_to(self.repo_path))
         lines = code.splitlines()
 
         # Create file node
         file_node_name = rel_path.replace("\\", "/")
-        self.graph.add_node(
-            file_node_name,
-            category="file",
-            kind="def",
-            file=rel_path,
-            language=language,
-            line=[1, len(lines)],
-            info=""
-        )
-
-        self.nodes.append(CodeNode(
+        parsed: ParsedNodes = [(CodeNode(
             name=file_node_name,
             kind="def",
             category="file",
@@ -305,27 +504,35 @@ class GraphBuilder:
             end_line=len(lines),
             language=language,
             info=""
-        ))
+        ), None)]
 
         # Use Python's AST for Python files (more accurate)
         if language == "python":
-            self._parse_python_file(file_path, code, rel_path, lines, file_node_name)
+            self._parse_python_file(parsed, code, rel_path, lines, file_node_name)
         else:
             # Use regex for other languages
-            self._parse_with_regex(language, code, rel_path, lines, file_node_name)
+            self._parse_with_regex(parsed, language, definition_regex, rel_path, lines, file_node_name)
+
+        return parsed, self._scan_imports(import_regexes, lines)
 
-    def _parse_python_file(self, file_path: Path, code: str, rel_path: str, lines: list[str], file_node_name: str):
+    def _parse_python_file(self, parsed: ParsedNodes, code: str, rel_path: str, lines: list[str], file_node_name: str):
         """Parse Python file using AST for accurate extraction."""
         try:
             tree = ast.parse(code)
         except SyntaxError:
             # Fall back to regex
-            self._parse_with_regex("python", code, rel_path, lines, file_node_name)
+            self._parse_with_regex(parsed, "python", DEFINITION_REGEXES["python"], rel_path, lines, file_node_name)
             return
 
+        # ast.walk() yields every class before its body, so methods are known by
+        # the time they are reached
+        method_ids = set()
+
         for node in ast.walk(tree):
             if isinstance(node, ast.ClassDef):
-                self._add_node(
+                method_ids.update(id(item) for item in node.body)
+                self._emit(
+                    parsed,
                     name=node.name,
                     category="class",
                     rel_path=rel_path,
@@ -340,7 +547,8 @@ class GraphBuilder:
                 for item in node.body:
                     if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
                         method_name = f"{node.name}.{item.name}"
-                        self._add_node(
+                        self._emit(
+                            parsed,
                             name=method_name,
                             category="method",
                             rel_path=rel_path,
@@ -351,10 +559,11 @@ class GraphBuilder:
                         )
 
             elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                # Only top-level functions
-                if any(node in getattr(n, 'body', []) for n in ast.walk(tree) if isinstance(n, ast.ClassDef)):
+                # Methods were added with their class
+                if id(node) in method_ids:
                     continue
-                self._add_node(
+                self._emit(
+                    parsed,
                     name=node.name,
                     category="function",
                     rel_path=rel_path,
@@ -364,51 +573,31 @@ class GraphBuilder:
                     parent=file_node_name
                 )
 
-    def _parse_with_regex(self, language: str, code: str, rel_path: str, lines: list[str], file_node_name: str):
-        """Parse file using regex patterns."""
-        patterns = DEFINITION_PATTERNS.get(language, {})
-
-        for line_num, line in enumerate(lines, 1):
-            stripped = line.strip()
-
-            for category, pattern in patterns.items():
-                match = re.match(pattern, stripped, re.MULTILINE)
-                if match:
-                    name = match.group(1)
-                    # Normalize category names
-                    norm_category = category.split("_")[0]  # const_func -> const
-                    if norm_category in ("const", "method"):
-                        norm_category = "function"
-
-                    self._add_node(
-                        name=name,
-                        category=norm_category,
-                        rel_path=rel_path,
-                        start_line=line_num,
-                        end_line=line_num,  # Approximate
-                        language=language,
-                        parent=file_node_name
-                    )
-                    break  # Only match one pattern per line
-
-    def _add_node(self, name: str, category: str, rel_path: str, start_line: int,
-                  end_line: int, language: str, parent: str, info: str = ""):
-        """Add a node to the graph."""
-        self.graph.add_node(
-            name,
-            category=category,
-            kind="def",
-            file=rel_path,
-            language=language,
-            line=[start_line, end_line],
-            info=info
-        )
+    def _parse_with_regex(self, parsed: ParsedNodes, language: str, regex: Optional[re.Pattern], rel_path: str,
+                          lines: list[str], file_node_name: str):
+        """Parse file using the language's fused definition regex."""
+        if regex is None:
+            return
 
-        # Add edge from parent
-        if parent and parent in self.graph:
-            self.graph.add_edge(parent, name)
+        # strip() and match() are mapped over the lines in C, leaving one test per line
+        for line_num, match in enumerate(map(regex.match, map(str.strip, lines)), 1):
+            if match:
+                # The pattern's own group comes right after its named group
+                self._emit(
+                    parsed,
+                    name=match.group(match.lastindex + 1),
+                    category=DEFINITION_CATEGORIES[match.lastgroup],
+                    rel_path=rel_path,
+                    start_line=line_num,
+                    end_line=line_num,  # Approximate
+                    language=language,
+                    parent=file_node_name
+                )
 
-        self.nodes.append(CodeNode(
+    def _emit(self, parsed: ParsedNodes, name: str, category: str, rel_path: str, start_line: int,
+              end_line: int, language: str, parent: str, info: str = ""):
+        """Record a definition found while parsing a file."""
+        parsed.append((CodeNode(
             name=name,
             kind="def",
             category=category,
@@ -418,74 +607,85 @@ class GraphBuilder:
             end_line=end_line,
             language=language,
             info=info
-        ))
-
-    def _build_import_edges(self, files: list[Path], file_map: dict):
-        """Build edges based on import relationships."""
-        for file_path in files:
-            try:
-                code = file_path.read_text(encoding="utf-8", errors="ignore")
-            except Exception:
-                continue
-
-            language = self._get_language(file_path)
-            from_file = str(file_path.relative_to(self.repo_path)).replace("\\", "/")
-            patterns = IMPORT_PATTERNS.get(language, [])
-
-            for line in code.splitlines():
-                for pattern in patterns:
-                    matches = re.findall(pattern, line.strip())
-                    for match in matches:
-                        self._add_import_edge(from_file, match, file_map)
-
-    def _add_import_edge(self, from_file: str, import_path: str, file_map: dict):
+        ), parent))
+
+    def _add_parsed(self, parsed: ParsedNodes):
+        """Add a parsed file's nodes to the graph, in the order they were found."""
+        for node, parent in parsed:
+            self.graph.add_node(
+                node.name,
+                category=node.category,
+                kind=node.kind,
+                file=node.rel_file,
+                language=node.language,
+                line=[node.start_line, node.end_line],
+                info=node.info
+            )
+
+            # Add edge from parent
+            if parent and parent in self.graph:
+                self.graph.add_edge(parent, node.name)
+
+            self.nodes.append(node)
+
+    def _scan_imports(self, regexes: list[re.Pattern], lines: list[str]) -> list[str]:
+        """Find the import paths referenced by a file's lines, in order."""
+        imports = []
+        if regexes:
+            for line in lines:
+                stripped = line.strip()
+                for regex in regexes:
+                    imports.extend(regex.findall(stripped))
+        return imports
+
+    def _add_import_edge(self, from_file: str, import_path: str, resolver: "_ImportResolver"):
         """Add an edge if the import target is in the repo."""
-        # Clean up import path
-        import_path = import_path.strip("./").replace("\\", "/")
-
-        # Try various ways to resolve the import
-        candidates = [
-            import_path,
-            import_path.replace(".", "/"),
-            import_path.split(".")[-1],
-            import_path.split("/")[-1],
-        ]
-
-        for candidate in candidates:
-            # Check if it matches a file in our map
-            for key, path in file_map.items():
-                if candidate in key or key.endswith(candidate):
-                    to_file = str(path.relative_to(self.repo_path)).replace("\\", "/")
-                    if from_file != to_file and from_file in self.graph and to_file in self.graph:
-                        self.graph.add_edge(from_file, to_file)
-                    return
+        to_file = resolver.resolve(import_path)
+        if to_file is not None and from_file != to_file and from_file in self.graph and to_file in self.graph:
+            self.graph.add_edge(from_file, to_file)
 
     def save(self, output_dir: str | Path):
         """Save graph and tags to output directory."""
+        return self.save_graph(output_dir), self.save_tags(output_dir)
+
+    def save_graph(self, output_dir: str | Path) -> Path:
+        """Save the graph, its snapshot and stats to output directory."""
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
         # Save NetworkX graph
         graph_path = output_dir / "graph.pkl"
         with open(graph_path, "wb") as f:
-            pickle.dump(self.graph, f)
+            pickle.dump(self.graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # Compact node/edge table, written after the pickle so readers see it as current
+        nodes = list(self.graph.nodes)
+        index = {name: i for i, name in enumerate(nodes)}
+        (output_dir / "graph_snapshot.json").write_bytes(orjson.dumps({
+            "nodes": nodes,
+            "attrs": [self.graph.nodes[name] for name in nodes],
+            "edges": [(index[u], index[v]) for u, v in self.graph.edges()],
+        }))
+
+        # Counts for callers that only need stats, so they can skip the pickle
+        (output_dir / "stats.json").write_bytes(orjson.dumps(self.get_stats()))
+
+        return graph_path
 
-        # Save tags as JSONL
+    def save_tags(self, output_dir: str | Path) -> Path:
+        """Save tags to output directory; needs only the nodes, not the graph."""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        # Save tags as JSONL, serialized into one buffer and written at once
         tags_path = output_dir / "tags.json"
-        with open(tags_path, "w", encoding="utf-8") as f:
-            for node in self.nodes:
-                f.write(json.dumps({
-                    "fname": node.file,
-                    "rel_fname": node.rel_file,
-                    "line": [node.start_line, node.end_line],
-                    "name": node.name,
-                    "kind": node.kind,
-                    "category": node.category,
-                    "language": node.language,
-                    "info": node.info,
-                }) + "\n")
-
-        return graph_path, tags_path
+        buf = bytearray()
+        for node in self.nodes:
+            buf += orjson.dumps(node.to_tag())
+            buf += b"\n"
+        tags_path.write_bytes(buf)
+
+        return tags_path
 
     def get_stats(self) -> dict:
         """Get graph statistics."""
@@ -503,6 +703,24 @@ class GraphBuilder:
         }
 
 
+def load_graph_snapshot(snapshot_path: str | Path) -> nx.DiGraph:
+    """
+    Rebuild a graph from the graph_snapshot.json written by GraphBuilder.save.
+
+    Args:
+        snapshot_path: Path to graph_snapshot.json
+
+    Returns:
+        NetworkX graph with the saved node attributes and edges
+    """
+    data = orjson.loads(Path(snapshot_path).read_bytes())
+    nodes = data["nodes"]
+    graph = nx.DiGraph()
+    graph.add_nodes_from(zip(nodes, data["attrs"]))
+    graph.add_edges_from((nodes[u], nodes[v]) for u, v in data["edges"])
+    return graph
+
+
 def build_graph(repo_path: str | Path, output_dir: Optional[str | Path] = None) -> tuple[nx.DiGraph, list[CodeNode]]:
     """
     Convenience function to build a graph from a repository.
@@ -5,23 +5,66 @@ Orchestrates the full workflow:
 GitHub URL → Download Repo → Graph Analysis → Graph Output
 """
 
+import logging
+import logging.handlers
+import mmap
+import os
+import queue
 import sys
 from pathlib import Path
 import pickle
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from typing import Optional
 import shutil
 
+import orjson
+
 # Handle imports whether running as module or directly
 try:
-    from .github_fetch import fetch_from_url, parse_github_url, GitHubFetchError, get_repo_info
+    from .github_fetch import (
+        fetch_github_repo, parse_github_url, GitHubFetchError, get_repo_info_if_changed, minimal_repo_info
+    )
     from .graph_builder import GraphBuilder
 except ImportError:
-    from github_fetch import fetch_from_url, parse_github_url, GitHubFetchError, get_repo_info
+    from github_fetch import (
+        fetch_github_repo, parse_github_url, GitHubFetchError, get_repo_info_if_changed, minimal_repo_info
+    )
     from graph_builder import GraphBuilder
 
 
-@dataclass
+logger = logging.getLogger("contextify.pipeline")
+
+
+def start_console_logging(verbose: bool = True) -> logging.handlers.QueueListener:
+    """
+    Print contextify progress logs to stdout from a background thread.
+
+    Records are queued by the analysing threads and written by a
+    QueueListener, so console I/O stays off the analysis path. Call stop()
+    on the returned listener to flush it.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+
+    root = logging.getLogger("contextify")
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO if verbose else logging.WARNING)
+    listener.start()
+    return listener
+
+
+# Files in each repo's output directory
+GRAPH_FILE = "graph.pkl"
+TAGS_FILE = "tags.json"
+STATS_FILE = "stats.json"
+REPO_INFO_FILE = "repo_info.json"
+FINGERPRINT_FILE = "fingerprint.txt"
+
+
+@dataclass(slots=True, frozen=True)
 class AnalysisResult:
     """Result of repository analysis."""
     repo_name: str
@@ -31,22 +74,55 @@ class AnalysisResult:
     node_count: int
     edge_count: int
     repo_info: dict
+    _graph: object = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def graph(self):
+        """The NetworkX graph, unpickled on first access."""
+        if self._graph is None:
+            object.__setattr__(self, "_graph", _load_graph(self.graph_path))
+        return self._graph
+
+
+def _load_graph(graph_path: Path):
+    """Unpickle a graph straight from a read-only memory map of graph.pkl."""
+    with open(graph_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return pickle.loads(mm)
+
+
+def _graph_counts(graph_path: Path) -> tuple[int, int]:
+    """Node and edge counts from stats.json, unpickling the graph only if it is missing or stale."""
+    stats_path = graph_path.with_name(STATS_FILE)
+    try:
+        if stats_path.stat().st_mtime_ns >= graph_path.stat().st_mtime_ns:
+            stats = orjson.loads(stats_path.read_bytes())
+            return stats["nodes"], stats["edges"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    G = _load_graph(graph_path)
+    return len(G.nodes), len(G.edges)
 
 
 class ContextifyPipeline:
     """Main pipeline for Contextify repository analysis."""
 
-    def __init__(self, output_dir: str = "./output", repos_dir: str = "./repos"):
+    def __init__(self, output_dir: str = "./output", repos_dir: str = "./repos", verbose: bool = True):
         self.output_dir = Path(output_dir)
         self.repos_dir = Path(repos_dir)
+        # Progress is logged at INFO; quiet pipelines skip it before any formatting
+        self.verbose = verbose
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.repos_dir.mkdir(parents=True, exist_ok=True)
+        # Repo output directories already created by this pipeline
+        self._created_dirs: set[str] = set()
 
     def analyze(
         self,
         github_url: str,
         force_download: bool = False,
-        force_analyze: bool = False
+        force_analyze: bool = False,
+        parsed: Optional[tuple[str, str]] = None,
     ) -> AnalysisResult:
         """
         Run the full analysis pipeline on a GitHub repository.
@@ -55,72 +131,88 @@ class ContextifyPipeline:
             github_url: GitHub repository URL
             force_download: Re-download even if repo exists locally
             force_analyze: Re-analyze even if graph exists
+            parsed: (owner, repo) already parsed from github_url, if available
 
         Returns:
             AnalysisResult with paths to outputs and stats
         """
-        # Parse URL and get repo info
-        owner, repo = parse_github_url(github_url)
-        repo_info = get_repo_info(owner, repo)
+        # Parse URL, then look up repo info in the background while the repo is
+        # downloaded and analyzed. The pool is per call because a module-level one
+        # would be inherited broken by forked worker processes.
+        owner, repo = parsed or parse_github_url(github_url)
+        repo_output_dir = self.output_dir / repo
+        if repo not in self._created_dirs:
+            repo_output_dir.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(repo)
+        metadata_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="repo-info")
+        repo_info_future = metadata_pool.submit(self._refresh_repo_info, owner, repo, repo_output_dir)
+        metadata_pool.shutdown(wait=False)
 
         # Set up output paths
-        repo_output_dir = self.output_dir / repo
-        repo_output_dir.mkdir(parents=True, exist_ok=True)
-        graph_path = repo_output_dir / "graph.pkl"
-        tags_path = repo_output_dir / "tags.json"
+        graph_path = repo_output_dir / GRAPH_FILE
+        tags_path = repo_output_dir / TAGS_FILE
+        fingerprint_path = repo_output_dir / FINGERPRINT_FILE
 
         # Check if already analyzed
+        fingerprint = None
         if graph_path.exists() and tags_path.exists() and not force_analyze:
             # Check if the actual repo directory still exists
             cached_repo_path = self.repos_dir / repo
             if not cached_repo_path.exists():
-                print(f"⚠ Cached graph found but repo directory missing: {cached_repo_path}")
-                print(f"  Re-downloading repository...")
+                logger.warning("Cached graph found but repo directory missing: %s; re-downloading", cached_repo_path)
                 force_download = True
                 # Continue to download step below
+            elif not _fingerprint_current(
+                fingerprint_path, fingerprint := GraphBuilder(cached_repo_path).source_fingerprint()
+            ):
+                self._progress("Source changed since last analysis, re-analyzing %s...", repo)
             else:
                 # Load existing results
-                with open(graph_path, "rb") as f:
-                    G = pickle.load(f)
+                node_count, edge_count = _graph_counts(graph_path)
                 return AnalysisResult(
                     repo_name=repo,
                     repo_path=cached_repo_path,
                     graph_path=graph_path,
                     tags_path=tags_path,
-                    node_count=len(G.nodes),
-                    edge_count=len(G.edges),
-                    repo_info=repo_info,
+                    node_count=node_count,
+                    edge_count=edge_count,
+                    repo_info=repo_info_future.result(),
                 )
 
         # Step 1: Download repository
-        print(f"Downloading {owner}/{repo}...")
-        repo_path = fetch_from_url(
-            github_url,
+        self._progress("Downloading %s/%s...", owner, repo)
+        repo_path = fetch_github_repo(
+            owner, repo,
             dest=self.repos_dir,
             force=force_download
         )
-        print(f"   Downloaded to: {repo_path}")
+        self._progress("   Downloaded to: %s", repo_path)
 
         # Step 2: Build code graph
-        print(f"Analyzing repository structure...")
+        self._progress("Analyzing repository structure...")
         builder = GraphBuilder(repo_path)
+        if fingerprint is None:
+            fingerprint = builder.source_fingerprint()
         G = builder.build()
 
         stats = builder.get_stats()
-        print(f"   Nodes: {stats['nodes']}, Edges: {stats['edges']}")
+        self._progress("   Nodes: %d, Edges: %d", stats['nodes'], stats['edges'])
 
         if stats['nodes'] == 0:
             raise ValueError(f"No supported source files found in {repo}")
 
         if stats.get('languages'):
-            print(f"   Languages: {stats['languages']}")
+            self._progress("   Languages: %s", stats['languages'])
 
-        # Step 3: Save outputs
-        builder.save(repo_output_dir)
+        # Step 3: Save outputs; tags need only the nodes, so they are written
+        # alongside the graph pickle
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="save-tags") as save_pool:
+            tags_future = save_pool.submit(builder.save_tags, repo_output_dir)
+            builder.save_graph(repo_output_dir)
+            tags_future.result()
+        fingerprint_path.write_text(fingerprint)
 
-        print(f"Analysis complete!")
-        print(f"   Graph saved to: {graph_path}")
-        print(f"   Tags saved to: {tags_path}")
+        self._progress("Analysis complete!\n   Graph saved to: %s\n   Tags saved to: %s", graph_path, tags_path)
 
         return AnalysisResult(
             repo_name=repo,
@@ -129,73 +221,213 @@ class ContextifyPipeline:
             tags_path=tags_path,
             node_count=stats['nodes'],
             edge_count=stats['edges'],
-            repo_info=repo_info,
+            repo_info=repo_info_future.result(),
         )
 
+    def analyze_many(
+        self,
+        github_urls: list[str],
+        force: bool = False,
+        concurrency: int = 8,
+    ) -> dict[str, AnalysisResult | Exception]:
+        """
+        Analyze several repositories concurrently.
+
+        Downloads and API calls share the pooled GitHub session and overlap
+        across threads; each graph build still fans out to worker processes
+        for larger repos. URLs naming the same owner/repo are analyzed once.
+
+        Args:
+            github_urls: GitHub repository URLs
+            force: Re-download and re-analyze even if outputs exist
+            concurrency: Maximum repositories in flight at once
+
+        Returns:
+            Mapping of each URL to its AnalysisResult, or to the exception
+            raised for it
+        """
+        results: dict[str, AnalysisResult | Exception] = {}
+        urls_by_repo: dict[tuple[str, str], list[str]] = {}
+        for url in github_urls:
+            try:
+                urls_by_repo.setdefault(parse_github_url(url), []).append(url)
+            except GitHubFetchError as e:
+                results[url] = e
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = {
+                pool.submit(
+                    self.analyze, urls[0], force_download=force, force_analyze=force, parsed=parsed
+                ): parsed
+                for parsed, urls in urls_by_repo.items()
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = e
+                for url in urls_by_repo[futures[future]]:
+                    results[url] = result
+
+        # One summary line rather than interleaved per-repo failures
+        failed = [url for url, result in results.items() if isinstance(result, Exception)]
+        self._progress("Analyzed %d of %d repositories", len(results) - len(failed), len(results))
+        for url in failed:
+            logger.warning("   %s: %s", url, results[url])
+
+        return results
+
+    def _progress(self, msg: str, *args):
+        """Log a progress message unless the pipeline is quiet."""
+        if self.verbose:
+            logger.info(msg, *args)
+
+    def _refresh_repo_info(self, owner: str, repo: str, repo_output_dir: Path) -> dict:
+        """
+        Get repo info, revalidating the copy cached in repo_info.json by its ETag.
+
+        Unchanged info costs a 304 with no body; if the API can't be reached the
+        cached copy (or minimal info) is used.
+        """
+        cache_path = repo_output_dir / REPO_INFO_FILE
+        cached = _read_repo_info_cache(cache_path)
+        cached_info = cached.get("repo_info")
+
+        try:
+            info, etag = get_repo_info_if_changed(owner, repo, cached.get("etag") if cached_info else None)
+        except GitHubFetchError:
+            return cached_info or minimal_repo_info(owner, repo)
+
+        if info is None:
+            return cached_info
+        try:
+            cache_path.write_bytes(orjson.dumps({"etag": etag, "repo_info": info}))
+        except OSError:
+            pass
+        return info
+
     def list_analyzed_repos(self) -> list[str]:
         """List all previously analyzed repositories."""
-        repos = []
-        for item in self.output_dir.iterdir():
-            if item.is_dir() and (item / "graph.pkl").exists():
-                repos.append(item.name)
-        return repos
+        # scandir's entry types come from the directory listing, leaving one stat per
+        # repo; symlinked output directories are still followed
+        with os.scandir(self.output_dir) as entries:
+            return [
+                entry.name for entry in entries
+                if entry.is_dir() and os.path.exists(os.path.join(entry.path, GRAPH_FILE))
+            ]
 
     def get_analysis(self, repo_name: str) -> Optional[AnalysisResult]:
         """Get analysis result for a previously analyzed repo."""
         repo_output_dir = self.output_dir / repo_name
-        graph_path = repo_output_dir / "graph.pkl"
-        tags_path = repo_output_dir / "tags.json"
+        graph_path = repo_output_dir / GRAPH_FILE
+        tags_path = repo_output_dir / TAGS_FILE
 
-        if not graph_path.exists():
+        try:
+            node_count, edge_count = _graph_counts(graph_path)
+        except FileNotFoundError:
             return None
-
-        with open(graph_path, "rb") as f:
-            G = pickle.load(f)
+        repo_info = _read_repo_info_cache(repo_output_dir / REPO_INFO_FILE).get("repo_info")
 
         return AnalysisResult(
             repo_name=repo_name,
             repo_path=self.repos_dir / repo_name,
             graph_path=graph_path,
             tags_path=tags_path,
-            node_count=len(G.nodes),
-            edge_count=len(G.edges),
-            repo_info={"name": repo_name},
+            node_count=node_count,
+            edge_count=edge_count,
+            repo_info=repo_info or {"name": repo_name},
         )
 
     def delete_analysis(self, repo_name: str) -> bool:
         """Delete analysis outputs for a repository."""
         repo_output_dir = self.output_dir / repo_name
+        self._created_dirs.discard(repo_name)
         if repo_output_dir.exists():
             shutil.rmtree(repo_output_dir)
             return True
         return False
 
 
+def _fingerprint_current(fingerprint_path: Path, fingerprint: str) -> bool:
+    """
+    Whether the saved fingerprint matches the local repo's current one.
+
+    Outputs saved before fingerprints existed are taken as current and get
+    one written now, rather than all being rebuilt.
+    """
+    saved = _read_text(fingerprint_path)
+    if saved is None:
+        try:
+            fingerprint_path.write_text(fingerprint)
+        except OSError:
+            pass
+        return True
+    return saved == fingerprint
+
+
+def _read_text(path: Path) -> Optional[str]:
+    """Read a small text file, or None if it can't be read."""
+    try:
+        return path.read_text()
+    except OSError:
+        return None
+
+
+def _read_repo_info_cache(cache_path: Path) -> dict:
+    """Load a repo_info.json written by _refresh_repo_info ({} if missing or unreadable)."""
+    try:
+        return orjson.loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+
+def analyze_repository(
+    github_url: str,
+    force: bool = False,
+    output_dir: str | Path = "./output",
+    repos_dir: str | Path = "./repos",
+    parsed: Optional[tuple[str, str]] = None,
+) -> AnalysisResult:
+    """
+    Analyze a repository with a fresh pipeline.
+
+    Module-level so it can be submitted to a process pool.
+    """
+    pipeline = ContextifyPipeline(output_dir=str(output_dir), repos_dir=str(repos_dir))
+    return pipeline.analyze(github_url, force_download=force, force_analyze=force, parsed=parsed)
+
+
 def main():
     """CLI entry point."""
     if len(sys.argv) < 2:
-        print("Usage: python pipeline.py <github_url> [--force]")
+        print("Usage: python pipeline.py <github_url> [--force] [--quiet]")
         print("Example: python pipeline.py https://github.com/pallets/flask")
         sys.exit(1)
 
     url = sys.argv[1]
     force = "--force" in sys.argv
+    verbose = "--quiet" not in sys.argv
 
-    pipeline = ContextifyPipeline()
+    listener = start_console_logging(verbose)
+    pipeline = ContextifyPipeline(verbose=verbose)
 
     try:
         result = pipeline.analyze(url, force_download=force, force_analyze=force)
-        print(f"\nSummary:")
-        print(f"   Repository: {result.repo_name}")
-        print(f"   Nodes: {result.node_count}")
-        print(f"   Edges: {result.edge_count}")
     except GitHubFetchError as e:
+        listener.stop()
         print(f"Error: {e}")
         sys.exit(1)
     except Exception as e:
+        listener.stop()
         print(f"Error: {e}")
         raise
 
+    # Flush queued progress before the summary
+    listener.stop()
+    print(f"\nSummary:")
+    print(f"   Repository: {result.repo_name}")
+    print(f"   Nodes: {result.node_count}")
+    print(f"   Edges: {result.edge_count}")
 
 if __name__ == "__main__":
     main()
@@ -10,16 +10,24 @@ Features:
 4. Progressive result updates for real-time feedback
 """
 import os
+import re
 import json
 import time
 import hashlib
+import pickle
+import random
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Callable
+import openai
+import orjson
 from rlm import RLM
 from dotenv import load_dotenv
 
 # Import existing Contextify infrastructure
-from pipeline import ContextifyPipeline
+from pipeline import ContextifyPipeline, start_console_logging, GRAPH_FILE, STATS_FILE, _load_graph
 from graph_builder import GraphBuilder, LANGUAGE_EXTENSIONS
 from api.graph_api import GraphAPI
 
@@ -27,6 +35,261 @@ from api.graph_api import GraphAPI
 load_dotenv()
 
 
+# Threads for file reads and hashing; both mostly wait on I/O or run outside the GIL
+IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Where scan results are written, resolved once so it doesn't follow later
+# changes to the working directory
+ANALYSIS_DIR = Path("analysis").resolve()
+
+# Per-file collection lines are printed only with RLM_VERBOSE set; progress
+# callbacks get one file_collected event per FILE_PROGRESS_INTERVAL files
+VERBOSE_FILES = bool(os.getenv("RLM_VERBOSE"))
+FILE_PROGRESS_INTERVAL = 100
+
+# Issues found for each file content, keyed by its hash, shared across scans and
+# repos; resolved once so it doesn't follow later changes to the working directory
+ISSUE_CACHE_DIR = Path(os.getenv("RLM_CACHE_DIR", ".rlm_cache")).resolve()
+
+# Model that analyzes each batch
+MODEL_NAME = "gpt-4o"
+
+# Files with fewer significant characters than this, once comments are
+# stripped, are recorded as "none" without being sent to the model
+MIN_CONTENT_CHARS = 20
+
+# Longest wait between retries of a failed batch, in seconds. Batches run one
+# at a time, so every wait stalls the whole scan: only a rate limit's
+# Retry-After may hold it up to MAX_RETRY_DELAY
+MAX_BACKOFF_DELAY = 5
+MAX_RETRY_DELAY = 30
+
+# Batches are packed up to this many (estimated) tokens and files
+MAX_BATCH_TOKENS = 60_000
+MAX_BATCH_FILES = 30
+
+
+def _estimate_tokens(content: str) -> int:
+    """Rough token count (about 4 characters per token)."""
+    return len(content) // 4 + 1
+
+
+def _pack_batches(file_items: List[tuple[str, str]]) -> List[Dict[str, str]]:
+    """
+    Pack files into batches by first-fit decreasing on estimated tokens.
+
+    Similar-sized files end up together; a file over the budget gets a batch of its own.
+    """
+    batches: List[Dict[str, str]] = []
+    batch_tokens: List[int] = []
+    sized = sorted(((_estimate_tokens(content), path, content) for path, content in file_items), key=lambda x: -x[0])
+    for tokens, path, content in sized:
+        for i, batch in enumerate(batches):
+            if batch_tokens[i] + tokens <= MAX_BATCH_TOKENS and len(batch) < MAX_BATCH_FILES:
+                batch[path] = content
+                batch_tokens[i] += tokens
+                break
+        else:
+            batches.append({path: content})
+            batch_tokens.append(tokens)
+    return batches
+
+
+def _walk_source_files(directory: str, extensions: set, exclude_re):
+    """
+    Yield (path, suffix) for supported files under directory, in the order Path.rglob("*") lists them.
+
+    Uses os.scandir so file and directory checks come from the directory read;
+    directories whose name matches exclude_re are not entered, since every path
+    below them would match too. Symlinked directories are not followed.
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    subdirs = []
+    for entry in entries:
+        name = entry.name
+        # Same rule as Path.suffix
+        i = name.rfind(".")
+        if 0 < i < len(name) - 1 and name[i:] in extensions:
+            try:
+                if entry.is_file():
+                    yield entry.path, name[i:]
+                    continue
+            except OSError:
+                continue
+        try:
+            if entry.is_dir(follow_symlinks=False) and (exclude_re is None or not exclude_re.search(name)):
+                subdirs.append(entry.path)
+        except OSError:
+            pass
+
+    for subdir in subdirs:
+        yield from _walk_source_files(subdir, extensions, exclude_re)
+
+
+def _read_source(path: Path) -> tuple[Optional[str], Optional[bytes], Optional[Exception]]:
+    """
+    Read a source file once, returning (text, sha256 of its bytes, error).
+
+    The text matches a text-mode read: strict UTF-8 with universal newlines.
+    """
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        content = raw.decode('utf-8')
+    except Exception as e:
+        return None, None, e
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content, hashlib.sha256(raw).digest(), None
+
+
+def _group_issues(issues_by_file: Dict[str, list], severity_counts: Counter, issues: list):
+    """Add new issues to the per-file grouping and severity counts, normalizing paths in place."""
+    for issue in issues:
+        if isinstance(issue, dict):
+            file = issue.get('file', 'unknown')
+            # Normalize path to forward slashes for consistency
+            normalized_file = file.replace('\\', '/')
+            # Update the file path in the issue itself
+            issue['file'] = normalized_file
+            issues_by_file.setdefault(normalized_file, []).append(issue)
+            severity_counts[issue.get('severity')] += 1
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before retrying a batch after error: exponential backoff with jitter."""
+    if isinstance(error, openai.RateLimitError):
+        # Honor the server's Retry-After when the rate limit response has one
+        try:
+            return min(float(error.response.headers["retry-after"]), MAX_RETRY_DELAY)
+        except (AttributeError, KeyError, ValueError):
+            pass
+    elif isinstance(error, openai.APIConnectionError):
+        # Dropped connections usually succeed straight away
+        return 1.0
+    return min(2 ** attempt + random.uniform(0, 1), MAX_BACKOFF_DELAY)
+
+
+_HASH_COMMENT_RE = re.compile(r'#[^\n]*')
+_C_COMMENT_RE = re.compile(r'//[^\n]*|/\*[\s\S]*?\*/')
+_MARKUP_COMMENT_RE = re.compile(r'<!--[\s\S]*?-->')
+_PHP_COMMENT_RE = re.compile(r'#[^\n]*|//[^\n]*|/\*[\s\S]*?\*/')
+_COMMENT_RES = {
+    "python": _HASH_COMMENT_RE,
+    "ruby": _HASH_COMMENT_RE,
+    "shell": _HASH_COMMENT_RE,
+    "yaml": _HASH_COMMENT_RE,
+    "toml": _HASH_COMMENT_RE,
+    "php": _PHP_COMMENT_RE,
+    "html": _MARKUP_COMMENT_RE,
+    "xml": _MARKUP_COMMENT_RE,
+    "vue": _MARKUP_COMMENT_RE,
+    "svelte": _MARKUP_COMMENT_RE,
+    "json": None,
+}
+
+
+def _is_trivial(path: str, content: str) -> bool:
+    """Whether a file is empty, or nothing but whitespace and comments, by a rough per-language heuristic."""
+    if len(content.strip()) < MIN_CONTENT_CHARS:
+        return True
+    language = LANGUAGE_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    comment_re = _COMMENT_RES.get(language, _C_COMMENT_RE)
+    if comment_re is None:
+        return False
+    return len("".join(comment_re.sub("", content).split())) < MIN_CONTENT_CHARS
+
+
+def _filter_batch_issues(issues: list, batch_files: Dict[str, str]) -> list:
+    """
+    Issues that name a file of the batch, with normalized paths.
+
+    Drops issues for invented files (class names, hallucinated paths) and
+    adds a "none" entry for each file the model reported nothing for.
+    """
+    valid_files = {path.replace('\\', '/') for path in batch_files}
+    kept = []
+    for issue in issues:
+        if not isinstance(issue, dict):
+            continue
+        file_path = str(issue.get('file', '')).replace('\\', '/')
+        if file_path in valid_files:
+            issue['file'] = file_path
+            kept.append(issue)
+
+    files_with_issues = {issue['file'] for issue in kept}
+    kept.extend(
+        {"file": file_path, "severity": "none", "description": "No issues found"}
+        for file_path in valid_files if file_path not in files_with_issues
+    )
+    return kept
+
+
+def _graph_stats(graph) -> dict:
+    """Node, edge and per-language file counts of an already built graph."""
+    languages = Counter(
+        attrs.get("language") for _, attrs in graph.nodes(data=True) if attrs.get("category") == "file"
+    )
+    return {
+        "nodes": graph.number_of_nodes(),
+        "edges": graph.number_of_edges(),
+        "languages": dict(languages),
+    }
+
+
+def _copy_to_duplicates(issues: list, duplicates: Dict[str, List[str]]) -> list:
+    """Issues plus a copy of each for every duplicate of the file it names."""
+    duplicates_by_file = {
+        path.replace('\\', '/'): [dup.replace('\\', '/') for dup in dups]
+        for path, dups in duplicates.items()
+    }
+    copies = [
+        {**issue, "file": dup}
+        for issue in issues if isinstance(issue, dict)
+        for dup in duplicates_by_file.get(str(issue.get('file', '')).replace('\\', '/'), ())
+    ]
+    return issues + copies
+
+
+def _sha256_text(content: str) -> bytes:
+    return hashlib.sha256(content.encode('utf-8')).digest()
+
+
+# Structured output for the per-file sub-LLM calls, so their replies are
+# schema-valid JSON; the root model still writes REPL code, so it can't use it
+ISSUE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "file_issues",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "issues": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "file": {"type": "string"},
+                            "severity": {"type": "string", "enum": ["none", "low", "medium", "high", "critical"]},
+                            "description": {"type": "string"},
+                        },
+                        "required": ["file", "severity", "description"],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["issues"],
+            "additionalProperties": False,
+        },
+    },
+}
+
 # Simple and direct system prompt
 ENHANCED_SYSTEM_PROMPT = """
 Analyze source code files for issues. Return ONLY the JSON array, no explanations.
@@ -56,61 +319,42 @@ prompts = []
 
 for fpath, code in files.items():
     safe_path = fpath.replace('\\\\', '/')
-    prompts.append(f\'\'\'Find issues in this code. Return JSON array ONLY, no markdown, no explanations.
-Use ONLY these severities: "none", "low", "medium", "high", "critical".
-If unsure about the description, use "Manual review recommended".
+    prompts.append(f\'\'\'Find issues in this code and list them in "issues".
+Description: max 5 words. If unsure about the description, use "Manual review recommended".
 
 IMPORTANT: The "file" field must be EXACTLY: {safe_path}
 Do NOT use class names, function names, or invented paths.
 
-Example format:
-[{{"file":"{safe_path}","severity":"high","description":"5 words max"}}]
-
-{code}
-
-JSON array only.\'\'\')
+{code}\'\'\')
 
 responses = llm_query_batched(prompts)
 
-# Create set of valid file paths for filtering
-valid_files = set(fpath.replace('\\\\', '/') for fpath in files.keys())
-
 all_issues = []
-files_with_issues = set()
-
 for resp in responses:
+    # Sub-call replies follow the issues schema; failed calls return an error string
     try:
-        cleaned = str(resp).strip()
-        if '```' in cleaned:
-            cleaned = '\\n'.join([line for line in cleaned.split('\\n') if not '```' in line])
-        cleaned = cleaned.replace('\\\\\\\\', '/')
-        issues = json.loads(cleaned)
-        if isinstance(issues, list):
-            # Filter out invalid files (hallucinations, class names, etc.)
-            for issue in issues:
-                if isinstance(issue, dict):
-                    file_path = issue.get('file', '').replace('\\\\', '/')
-                    # Only include if it matches a real file from our input
-                    if file_path in valid_files:
-                        all_issues.append(issue)
-                        files_with_issues.add(file_path)
-    except:
+        all_issues.extend(json.loads(resp)["issues"])
+    except (ValueError, TypeError, KeyError):
         pass
 
-# Add "none" severity for files that were analyzed but had no issues returned
-for fpath in valid_files:
-    if fpath not in files_with_issues:
-        all_issues.append({
-            "file": fpath,
-            "severity": "none",
-            "description": "No issues found"
-        })
-
 print(json.dumps(all_issues))
 ```
 
 CRITICAL: Output only the final JSON array. NO explanations, NO markdown, NO text. Just the array."""
 
+# Cached issues are filed under the model, prompt and schema that produced them,
+# so changing any of these starts a fresh cache instead of reusing stale results
+_ISSUE_CACHE_VERSION = hashlib.blake2b(
+    json.dumps([MODEL_NAME, ENHANCED_SYSTEM_PROMPT, ISSUE_RESPONSE_FORMAT], sort_keys=True).encode("utf-8"),
+    digest_size=8,
+).hexdigest()
+
+
+def _issue_cache_file(file_hash: bytes) -> Path:
+    """Where the issues for a file content hash are cached."""
+    hex_hash = file_hash.hex()
+    return ISSUE_CACHE_DIR / _ISSUE_CACHE_VERSION / hex_hash[:2] / f"{hex_hash}.json"
+
 
 class EnhancedRLMScanner:
     """Enhanced scanner integrated with Contextify backend infrastructure."""
@@ -139,9 +383,10 @@ class EnhancedRLMScanner:
             backend="openai",
             backend_kwargs={
                 "api_key": api_key,
-                "model_name": "gpt-4o",
+                "model_name": MODEL_NAME,
             },
             custom_system_prompt=ENHANCED_SYSTEM_PROMPT,
+            sub_sampling_args={"response_format": ISSUE_RESPONSE_FORMAT},
             max_iterations=max_iterations,
             verbose=True,
         )
@@ -149,33 +394,96 @@ class EnhancedRLMScanner:
         # Use existing Contextify pipeline
         self.pipeline = ContextifyPipeline(output_dir=output_dir, repos_dir=repos_dir)
         self.progress_callback = progress_callback
+        # Content hashes taken while collect_source_files read each file
+        self._file_hashes: Dict[str, bytes] = {}
 
     def _notify_progress(self, event_type: str, data: dict):
         """Send progress notification if callback is set."""
         if self.progress_callback:
             self.progress_callback({"type": event_type, **data})
 
-    def _check_previously_analyzed(self, files: Dict[str, str], output_file: str) -> set:
+    def _hash_files(self, files: Dict[str, str]) -> Dict[str, bytes]:
+        """SHA-256 digest of each file's content, keyed like files."""
+        known = self._file_hashes
+        missing = [file_path for file_path in files if file_path not in known]
+        if not missing:
+            return {file_path: known[file_path] for file_path in files}
+
+        # Files that didn't come from collect_source_files are hashed from their text
+        with ThreadPoolExecutor(max_workers=IO_WORKERS) as pool:
+            hashed = dict(zip(missing, pool.map(_sha256_text, (files[file_path] for file_path in missing))))
+        return {file_path: known.get(file_path) or hashed[file_path] for file_path in files}
+
+    def _check_previously_analyzed(
+        self,
+        files: Dict[str, str],
+        output_file: str,
+        file_hashes: Optional[Dict[str, bytes]] = None
+    ) -> set:
         """Check which files were previously analyzed (unchanged)."""
         if not output_file or not os.path.exists(output_file):
             return set()
         
         try:
-            with open(output_file, 'r', encoding='utf-8') as f:
-                prev = json.load(f)
+            with open(output_file, 'rb') as f:
+                prev = orjson.loads(f.read())
             
-            prev_hashes = prev.get('file_hashes', {})
+            # Saved as hex; compared as raw digests
+            prev_hashes = {path: bytes.fromhex(digest) for path, digest in prev.get('file_hashes', {}).items()}
+            if file_hashes is None:
+                file_hashes = self._hash_files(files)
             previously_analyzed = set()
             
-            for file_path, content in files.items():
-                file_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
-                if file_path in prev_hashes and prev_hashes[file_path] == file_hash:
+            for file_path in files:
+                if prev_hashes.get(file_path) == file_hashes[file_path]:
                     previously_analyzed.add(file_path)
             
             return previously_analyzed
         except:
             return set()
 
+    def _load_previous_issues(self, output_file: Path, file_paths: set) -> list:
+        """Issues recorded for the given files by a previous scan."""
+        if not file_paths:
+            return []
+        try:
+            with open(output_file, 'rb') as f:
+                issues_by_file = orjson.loads(f.read()).get('issues_by_file', {})
+        except:
+            return []
+
+        issues = []
+        for file_path in file_paths:
+            issues.extend(issues_by_file.get(file_path.replace('\\', '/'), []))
+        return issues
+
+    def _load_cached_issues(self, file_hash: bytes) -> Optional[list]:
+        """Issues cached for a file content hash, or None if it hasn't been analyzed."""
+        try:
+            with open(_issue_cache_file(file_hash), 'rb') as f:
+                return orjson.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _cache_issues(self, batch_files: Dict[str, str], issues: list, file_hashes: Dict[str, bytes]):
+        """Cache a successful batch's issues under each file's content hash."""
+        issues_by_path = {path.replace('\\', '/'): [] for path in batch_files}
+        for issue in issues:
+            if isinstance(issue, dict):
+                file_issues = issues_by_path.get(str(issue.get('file', '')).replace('\\', '/'))
+                if file_issues is not None:
+                    file_issues.append(issue)
+
+        for path in batch_files:
+            cache_file = _issue_cache_file(file_hashes[path])
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{threading.get_ident()}.tmp")
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file.write_bytes(orjson.dumps(issues_by_path[path.replace('\\', '/')]))
+                os.replace(tmp_file, cache_file)
+            except OSError as e:
+                print(f"[WARNING] Could not cache issues for {path}: {e}")
+
     # Removed: parse_github_url and clone_github_repo
     # Now using existing infrastructure from github_fetch.py and pipeline.py
 
@@ -212,6 +520,7 @@ class EnhancedRLMScanner:
             ]
 
         files = {}
+        self._file_hashes = {}
         root_path = Path(directory).resolve()  # Get absolute path
 
         print(f"\n[COLLECTING FILES]")
@@ -225,37 +534,42 @@ class EnhancedRLMScanner:
         # Get all supported extensions from LANGUAGE_EXTENSIONS
         supported_extensions = set(LANGUAGE_EXTENSIONS.keys())
 
-        for source_file in root_path.rglob("*"):
-            if not source_file.is_file():
-                continue
+        # One search for any excluded substring anywhere in the path
+        exclude_re = re.compile("|".join(map(re.escape, exclude_patterns))) if exclude_patterns else None
 
-            # Check if file has a supported extension
-            if source_file.suffix not in supported_extensions:
+        # Filter paths first, then read the survivors on a thread pool
+        candidates = []
+        for source_file, suffix in _walk_source_files(str(root_path), supported_extensions, exclude_re):
+            # Check exclusions
+            if exclude_re is not None and exclude_re.search(source_file):
                 continue
 
-            # Check exclusions
-            should_exclude = False
-            for pattern in exclude_patterns:
-                if pattern in str(source_file):
-                    should_exclude = True
-                    break
+            candidates.append((source_file, suffix))
 
-            if should_exclude:
-                continue
+        with ThreadPoolExecutor(max_workers=IO_WORKERS) as pool:
+            read_results = list(pool.map(_read_source, [source_file for source_file, _ in candidates]))
 
+        # Report in walk order from this thread once every read is done
+        for (source_file, suffix), (content, digest, error) in zip(candidates, read_results):
             # Make path relative to root
-            relative_path = source_file.relative_to(root_path)
+            relative_path = os.path.relpath(source_file, root_path)
 
-            try:
-                with open(source_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    files[str(relative_path)] = content
-                    lang = LANGUAGE_EXTENSIONS[source_file.suffix]
-                    print(f"  [+] {relative_path} ({len(content)} chars, {lang})")
-                    print(f"      Full path: {source_file}")
-                    self._notify_progress("file_collected", {"file": str(relative_path), "language": lang})
-            except Exception as e:
-                print(f"  [!] Failed to read {relative_path}: {e}")
+            if error is not None:
+                print(f"  [!] Failed to read {relative_path}: {error}")
+                continue
+
+            files[relative_path] = content
+            self._file_hashes[relative_path] = digest
+            lang = LANGUAGE_EXTENSIONS[suffix]
+            if VERBOSE_FILES:
+                print(f"  [+] {relative_path} ({len(content)} chars, {lang})")
+                print(f"      Full path: {source_file}")
+            if len(files) % FILE_PROGRESS_INTERVAL == 0:
+                self._notify_progress("file_collected", {
+                    "file": relative_path,
+                    "language": lang,
+                    "files_collected": len(files)
+                })
 
         print(f"\n[SUMMARY]")
         print(f"Total files collected: {len(files)}")
@@ -264,7 +578,32 @@ class EnhancedRLMScanner:
 
         return files
 
-    def scan_repository(self, directory: str, repo_name: Optional[str] = None, skip_graph_building: bool = False) -> dict:
+    def _load_existing_stats(self, repo_name: Optional[str]) -> Optional[dict]:
+        """
+        Stats of the graph the pipeline saved for repo_name, or None if there isn't one.
+
+        Read from stats.json; the graph is only unpickled when that is missing or stale.
+        """
+        if not repo_name:
+            return None
+        graph_path = self.pipeline.output_dir / repo_name / GRAPH_FILE
+        stats_path = graph_path.with_name(STATS_FILE)
+        try:
+            if stats_path.stat().st_mtime_ns >= graph_path.stat().st_mtime_ns:
+                return orjson.loads(stats_path.read_bytes())
+        except (OSError, ValueError):
+            pass
+        try:
+            return _graph_stats(_load_graph(graph_path))
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def scan_repository(
+        self,
+        directory: str,
+        repo_name: Optional[str] = None,
+        skip_graph_building: bool = False
+    ) -> dict:
         """
         Scan a repository with RLM using existing graph infrastructure.
 
@@ -272,6 +611,7 @@ class EnhancedRLMScanner:
             directory: Path to repository directory
             repo_name: Optional name for the repository (used for output)
             skip_graph_building: If True, assumes graph is already built (for API usage)
+                and reads its stats from the pipeline's output for repo_name
 
         Returns:
             Dictionary with analysis results
@@ -282,9 +622,9 @@ class EnhancedRLMScanner:
         print(f"Directory: {directory}")
         dir_path = Path(directory)
         print(f"Directory exists: {dir_path.exists()}")
-        if dir_path.exists():
-            all_files = list(dir_path.rglob("*"))
-            file_count = sum(1 for f in all_files if f.is_file())
+        # A full extra tree walk, so only when debugging; collect_source_files walks it next
+        if os.environ.get("RLM_DEBUG") and dir_path.exists():
+            file_count = sum(1 for f in dir_path.rglob("*") if f.is_file())
             print(f"Total files in directory: {file_count}")
         print(f"Repo name: {repo_name}")
         print(f"Skip graph building: {skip_graph_building}")
@@ -316,11 +656,14 @@ class EnhancedRLMScanner:
                 return {"error": "No files found"}
         else:
             print("\n[USING EXISTING GRAPH]")
-            # When skip_graph_building=True, graph was already built by pipeline
-            # Rebuild it here for context (needed for RLM analysis)
-            builder = GraphBuilder(directory)
-            graph = builder.build()
-            stats = builder.get_stats()
+            # When skip_graph_building=True, graph was already built by pipeline;
+            # rebuild it only if it wasn't saved
+            stats = self._load_existing_stats(repo_name)
+            if stats is None:
+                print("   No saved graph found, rebuilding")
+                builder = GraphBuilder(directory)
+                builder.build()
+                stats = builder.get_stats()
             print(f"   Nodes: {stats['nodes']}, Edges: {stats['edges']}")
             print(f"   Languages: {stats.get('languages', {})}")
             
@@ -366,177 +709,106 @@ class EnhancedRLMScanner:
                 "message": "No source files found for RLM analysis"
             }
 
-        # Convert graph to JSON format for RLM context
-        # Create a simplified graph representation
-        graph_data = {
-            "nodes": [{"name": n, **graph.nodes[n]} for n in graph.nodes()],
-            "edges": [{"from": u, "to": v} for u, v in graph.edges()],
-            "stats": stats
-        }
-
-        # Batched RLM analysis
-        BATCH_SIZE = 10
-        file_items = list(files.items())
-        batches = [dict(file_items[i:i + BATCH_SIZE]) for i in range(0, len(file_items), BATCH_SIZE)]
+        output_dir = ANALYSIS_DIR
+        if repo_name:
+            output_dir = output_dir / repo_name
+        output_file = output_dir / "detailed_analysis.json"
+
+        # Files unchanged since the last scan keep their issues instead of being re-sent
+        file_hashes = self._hash_files(files)
+        unchanged = self._check_previously_analyzed(files, str(output_file), file_hashes)
+        changed_items = []
+        trivial = []
+        # Byte-identical files are sent once; their issues are copied to the others
+        duplicates: Dict[str, List[str]] = {}
+        sent_by_hash: Dict[bytes, str] = {}
+        for path, content in files.items():
+            if path in unchanged:
+                continue
+            if _is_trivial(path, content):
+                trivial.append((path, content))
+                continue
+            sent = sent_by_hash.setdefault(file_hashes[path], path)
+            if sent == path:
+                changed_items.append((path, content))
+            else:
+                duplicates.setdefault(sent, []).append(path)
+
+        # Content analyzed by any earlier scan reuses its cached issues
+        to_analyze = []
+        cached_issues = []
+        cached_paths = []
+        for path, content in changed_items:
+            issues = self._load_cached_issues(file_hashes[path])
+            if issues is None:
+                to_analyze.append((path, content))
+            else:
+                cached_issues.extend({**issue, "file": path} for issue in issues if isinstance(issue, dict))
+                cached_paths.append(path)
+
+        # Batched RLM analysis, packed to a token budget
+        batches = _pack_batches(to_analyze)
 
         print(f"\n[RLM ANALYSIS]")
         print(f"Total files: {len(files)}")
-        print(f"Batches: {len(batches)} x {BATCH_SIZE} files")
-
-        all_issues = []
+        print(f"Unchanged since last scan: {len(unchanged)}")
+        print(f"Empty or minimal (not sent): {len(trivial)}")
+        print(f"Duplicates of another file (not sent): {sum(map(len, duplicates.values()))}")
+        print(f"Cached from an earlier scan: {len(cached_paths)}")
+        if batches:
+            avg_tokens = sum(_estimate_tokens(content) for _, content in to_analyze) // len(batches)
+            print(f"Batches: {len(batches)} (avg {avg_tokens} tok)")
+
+        all_issues = self._load_previous_issues(output_file, unchanged)
+        # The prompt would have the model mark these "none"; record that directly
+        all_issues.extend(
+            {"file": path, "severity": "none", "description": "Empty or minimal file"}
+            for path, _ in trivial
+        )
+        all_issues.extend(_copy_to_duplicates(cached_issues, duplicates) if duplicates else cached_issues)
+        # Grouping and counts are updated per batch rather than rebuilt from all issues
+        issues_by_file: Dict[str, list] = {}
+        severity_counts = Counter()
+        _group_issues(issues_by_file, severity_counts, all_issues)
+        # Hashes are recorded only for files whose analysis is in the results
+        analyzed_hashes = {path: file_hashes[path] for path in unchanged}
+        analyzed_hashes.update((path, file_hashes[path]) for path, _ in trivial)
+        for path in cached_paths:
+            analyzed_hashes[path] = file_hashes[path]
+            analyzed_hashes.update((dup, file_hashes[dup]) for dup in duplicates.get(path, ()))
         total_execution_time = 0
 
-        # Process each batch
-        for batch_num, batch_files in enumerate(batches, 1):
-            print(f"\n{'='*70}")
-            print(f"BATCH {batch_num}/{len(batches)}")
-            print(f"{'='*70}")
-
-            # Notify that this batch is starting
-            self._notify_progress("batch_start", {
-                "repo_name": repo_name,
-                "batch": batch_num,
-                "total_batches": len(batches),
-                "files_in_batch": len(batch_files)
-            })
+        if not batches:
+            self._save_analysis(
+                output_file, files, issues_by_file, severity_counts, len(all_issues), analyzed_hashes, 0, 0
+            )
 
-            # Prepare context for RLM with graph data
-            context = {"files": batch_files, "graph": graph_data}
-
-            # Direct and specific query
-            query = """Output ONLY the final JSON array. No explanations. No markdown. Just the raw JSON array of issues."""
-
-            # Retry loop: up to 3 attempts with 10s delay between retries
-            MAX_RETRIES = 3
-            batch_issues = []
-            batch_succeeded = False
-
-            for attempt in range(1, MAX_RETRIES + 1):
-                try:
-                    print(f"Running RLM (attempt {attempt}/{MAX_RETRIES})...")
-                    result = self.rlm.completion(prompt=context, root_prompt=query)
-                    total_execution_time += result.execution_time
-
-                    # Show what RLM returned
-                    print(f"\n{'='*70}")
-                    print(f"RLM RETURNED (as Python variable):")
-                    print(f"{'='*70}")
-                    print(f"Type: {type(result.response)}")
-                    print(f"\nValue:")
-                    print(repr(result.response))
-                    print(f"{'='*70}\n")
-
-                    # Parse response
-                    batch_issues = []
-                    if isinstance(result.response, list):
-                        batch_issues = result.response
-                        print(f"✓ Already a list!")
-                    elif isinstance(result.response, str):
-                        response_str = result.response.strip()
-
-                        # Check if response has FINAL_RESULT markers
-                        if "=== FINAL_RESULT ===" in response_str and "=== END_RESULT ===" in response_str:
-                            try:
-                                start = response_str.index("=== FINAL_RESULT ===") + len("=== FINAL_RESULT ===")
-                                end = response_str.index("=== END_RESULT ===")
-                                json_str = response_str[start:end].strip()
-                                batch_issues = json.loads(json_str)
-                                print(f"✓ Extracted from FINAL_RESULT markers")
-                            except Exception as e:
-                                print(f"✗ Failed to extract from markers: {e}")
-
-                        # Try to extract JSON from markdown code blocks
-                        if not batch_issues and "```json" in response_str:
-                            try:
-                                import re
-                                json_match = re.search(r'```json\s*\n([\s\S]*?)\n```', response_str)
-                                if json_match:
-                                    json_str = json_match.group(1).strip()
-                                    batch_issues = json.loads(json_str)
-                                    print(f"✓ Extracted JSON from markdown code block")
-                            except Exception as e:
-                                print(f"✗ Failed to extract from markdown: {e}")
-
-                        # Try direct JSON parsing if we don't have issues yet
-                        if not batch_issues:
-                            try:
-                                batch_issues = json.loads(response_str)
-                                print(f"✓ Parsed as JSON")
-                            except json.JSONDecodeError as e:
-                                print(f"✗ JSON parse failed: {e}")
-
-                                # Try Python literal_eval (handles Python repr format)
-                                try:
-                                    import ast
-                                    batch_issues = ast.literal_eval(response_str)
-                                    print(f"✓ Parsed as Python literal (using ast.literal_eval)")
-                                except Exception as e2:
-                                    print(f"✗ Python literal parse also failed: {e2}")
-                                    print(f"String was: {response_str[:300]}...")
-
-                    # Ensure batch_issues is a list
-                    if not isinstance(batch_issues, list):
-                        batch_issues = []
-
-                    batch_succeeded = True
-                    break  # Success — exit retry loop
-
-                except Exception as e:
-                    print(f"✗ Batch {batch_num} attempt {attempt} failed: {e}")
-                    if attempt < MAX_RETRIES:
-                        print(f"  Retrying in 10 seconds...")
-                        time.sleep(10)
-                    else:
-                        print(f"✗ Batch {batch_num} failed after {MAX_RETRIES} attempts")
-                        self._notify_progress("batch_error", {
-                            "repo_name": repo_name,
-                            "batch": batch_num,
-                            "total_batches": len(batches),
-                            "error": str(e)
-                        })
-
-            if not batch_succeeded:
-                batch_issues = []
+        # Batches run one at a time: the RLM's LocalREPL swaps the process-wide
+        # sys.stdout and working directory while it executes, so concurrent
+        # batches would clobber each other. Results are saved after each one.
+        for batch_num, batch_files in enumerate(batches, 1):
+            batch_issues, execution_time, batch_succeeded = self._run_batch(
+                batch_num, batch_files, len(batches), repo_name
+            )
+            total_execution_time += execution_time
+            if batch_succeeded:
+                self._cache_issues(batch_files, batch_issues, file_hashes)
+                analyzed_hashes.update((path, file_hashes[path]) for path in batch_files)
+                for path in batch_files:
+                    analyzed_hashes.update((dup, file_hashes[dup]) for dup in duplicates.get(path, ()))
+            if duplicates:
+                batch_issues = _copy_to_duplicates(batch_issues, duplicates)
 
             all_issues.extend(batch_issues)
-            print(f"✓ Got {len(batch_issues)} issues ({result.execution_time:.2f}s)")
+            _group_issues(issues_by_file, severity_counts, batch_issues)
+            print(f"✓ Batch {batch_num}: got {len(batch_issues)} issues ({execution_time:.2f}s)")
             print(f"✓ Total so far: {len(all_issues)}")
 
             # PROGRESSIVE UPDATE: Save after each batch!
-            output_dir = Path("analysis")
-            if repo_name:
-                output_dir = output_dir / repo_name
-            output_dir.mkdir(parents=True, exist_ok=True)
-
-            # Group all issues collected so far by file (normalize paths to forward slashes)
-            issues_by_file = {}
-            for issue in all_issues:
-                if isinstance(issue, dict):
-                    file = issue.get('file', 'unknown')
-                    # Normalize path to forward slashes for consistency
-                    normalized_file = file.replace('\\', '/')
-                    if normalized_file not in issues_by_file:
-                        issues_by_file[normalized_file] = []
-                    # Update the file path in the issue itself
-                    issue['file'] = normalized_file
-                    issues_by_file[normalized_file].append(issue)
-
-            frontend_data = {
-                "issues_by_file": issues_by_file,
-                "summary": {
-                    "total_files": len(files),
-                    "files_with_issues": len(issues_by_file),
-                    "total_issues": len(all_issues),
-                    "critical_issues": len([i for i in all_issues if isinstance(i, dict) and i.get('severity') == 'critical']),
-                    "high_issues": len([i for i in all_issues if isinstance(i, dict) and i.get('severity') == 'high']),
-                    "batches_completed": batch_num,
-                    "total_batches": len(batches)
-                }
-            }
-
-            output_file = output_dir / "detailed_analysis.json"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(frontend_data, f, indent=2)
+            frontend_data = self._save_analysis(
+                output_file, files, issues_by_file, severity_counts, len(all_issues),
+                analyzed_hashes, batch_num, len(batches)
+            )
 
             print(f"[SAVED] Progressive update {batch_num}/{len(batches)} to {output_file}")
 
@@ -547,7 +819,8 @@ class EnhancedRLMScanner:
                 "total_batches": len(batches),
                 "batch_issues": len(batch_issues),
                 "total_issues": len(all_issues),
-                "issues_by_file": issues_by_file,
+                # A snapshot, as later batches keep appending to the grouping
+                "issues_by_file": {file: list(issues) for file, issues in issues_by_file.items()},
                 "summary": frontend_data["summary"]
             })
 
@@ -573,10 +846,7 @@ class EnhancedRLMScanner:
                     print(f"{i:3}. [{severity:8}] {file:50} {desc}")
 
         print(f"\n{'='*70}")
-        output_dir = Path("analysis")
-        if repo_name:
-            output_dir = output_dir / repo_name
-        print(f"[SAVED] Final results in {output_dir / 'detailed_analysis.json'}")
+        print(f"[SAVED] Final results in {output_file}")
 
         # Return minimal data
         return {
@@ -586,6 +856,127 @@ class EnhancedRLMScanner:
             "issues": all_issues
         }
 
+    def _run_batch(
+        self,
+        batch_num: int,
+        batch_files: Dict[str, str],
+        total_batches: int,
+        repo_name: Optional[str]
+    ) -> tuple[list, float, bool]:
+        """
+        Analyze one batch with RLM, retrying failures.
+
+        Returns (issues, execution time, succeeded).
+        """
+        print(f"\n{'='*70}")
+        print(f"BATCH {batch_num}/{total_batches}")
+        print(f"{'='*70}")
+
+        # Notify that this batch is starting
+        self._notify_progress("batch_start", {
+            "repo_name": repo_name,
+            "batch": batch_num,
+            "total_batches": total_batches,
+            "files_in_batch": len(batch_files)
+        })
+
+        # The prompt only reads context["files"], so the graph isn't sent
+        context = {"files": batch_files}
+
+        # Direct and specific query
+        query = """Output ONLY the final JSON array. No explanations. No markdown. Just the raw JSON array of issues."""
+
+        # Failed RLM calls get up to 3 attempts, backing off between retries
+        MAX_RETRIES = 3
+        execution_time = 0
+
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                print(f"Running RLM (attempt {attempt}/{MAX_RETRIES})...")
+                result = self.rlm.completion(prompt=context, root_prompt=query)
+                execution_time += result.execution_time
+
+            except Exception as e:
+                print(f"✗ Batch {batch_num} attempt {attempt} failed: {e}")
+                if attempt < MAX_RETRIES:
+                    delay = _retry_delay(e, attempt)
+                    print(f"  Retrying in {delay:.1f} seconds...")
+                    time.sleep(delay)
+                    continue
+                print(f"✗ Batch {batch_num} failed after {MAX_RETRIES} attempts")
+                self._notify_batch_error(repo_name, batch_num, total_batches, e)
+                return [], execution_time, False
+
+            # Show what RLM returned
+            print(f"\n{'='*70}")
+            print(f"RLM RETURNED (as Python variable):")
+            print(f"{'='*70}")
+            print(f"Type: {type(result.response)}")
+            print(f"\nValue:")
+            print(repr(result.response))
+            print(f"{'='*70}\n")
+
+            # The REPL prints the already validated issues with json.dumps, so a
+            # malformed reply won't improve on a retry: fail the batch instead
+            try:
+                batch_issues = json.loads(result.response)
+                if not isinstance(batch_issues, list):
+                    raise ValueError(f"expected a JSON array, got {type(batch_issues).__name__}")
+            except (TypeError, ValueError) as e:  # json.JSONDecodeError is a ValueError
+                print(f"✗ Batch {batch_num} returned malformed issues: {e}")
+                self._notify_batch_error(repo_name, batch_num, total_batches, e)
+                return [], execution_time, False
+
+            return _filter_batch_issues(batch_issues, batch_files), execution_time, True
+
+        return [], execution_time, False
+
+    def _notify_batch_error(self, repo_name: str, batch_num: int, total_batches: int, error: Exception):
+        """Report a batch that produced no issues."""
+        self._notify_progress("batch_error", {
+            "repo_name": repo_name,
+            "batch": batch_num,
+            "total_batches": total_batches,
+            "error": str(error)
+        })
+
+    def _save_analysis(
+        self,
+        output_file: Path,
+        files: Dict[str, str],
+        issues_by_file: Dict[str, list],
+        severity_counts: Counter,
+        total_issues: int,
+        file_hashes: Dict[str, bytes],
+        batches_completed: int,
+        total_batches: int
+    ) -> dict:
+        """Write the results gathered so far to detailed_analysis.json and return them."""
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+
+        frontend_data = {
+            "issues_by_file": issues_by_file,
+            "summary": {
+                "total_files": len(files),
+                "files_with_issues": len(issues_by_file),
+                "total_issues": total_issues,
+                "critical_issues": severity_counts['critical'],
+                "high_issues": severity_counts['high'],
+                "batches_completed": batches_completed,
+                "total_batches": total_batches
+            },
+            # Lets the next scan skip files whose content hasn't changed
+            "file_hashes": {path: digest.hex() for path, digest in file_hashes.items()}
+        }
+
+        # Rewritten after every batch, so it is written compact with orjson;
+        # written beside the file and swapped in, so readers never see a partial write
+        tmp_file = output_file.with_name(output_file.name + ".tmp")
+        tmp_file.write_bytes(orjson.dumps(frontend_data))
+        os.replace(tmp_file, output_file)
+
+        return frontend_data
+
     def scan_github_repo(
         self,
         github_url: str,
@@ -654,6 +1045,7 @@ def main():
     force = "--force" in sys.argv
 
     scanner = EnhancedRLMScanner(max_iterations=30)
+    listener = start_console_logging()
 
     try:
         if "github.com" in target or "/" in target:
@@ -674,6 +1066,8 @@ def main():
         print(f"\n[ERROR] {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
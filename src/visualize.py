@@ -5,11 +5,34 @@ Creates an interactive HTML visualization of the code graph.
 Opens directly in browser - no npm/node required.
 """
 
+import base64
+import gzip
+import hashlib
 import json
+import math
+import mmap
 import pickle
-import webbrowser
 import sys
+from collections import Counter
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import networkx as nx
+import orjson
+
+# Compact node/edge table GraphBuilder writes beside graph.pkl
+SNAPSHOT_FILE = "graph_snapshot.json"
+
+# Node radius range; nodes with more outgoing links are bigger
+MIN_NODE_SIZE = 4
+MAX_NODE_SIZE = 25
+
+# Node positions cached beside graph.pkl, keyed by a hash of the graph's nodes and links
+LAYOUT_FILE = "layout.json"
+
+# networkx's layouts compute dense pairwise forces (an n x n x 2 array per
+# iteration), so larger graphs are left to the browser's Barnes-Hut d3-force
+MAX_LAYOUT_NODES = 2000
 
 
 HTML_TEMPLATE = """<!DOCTYPE html>
@@ -53,9 +76,8 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             margin-left: 20px;
         }}
         #graph {{
-            width: 100vw;
-            height: 100vh;
-            padding-top: 60px;
+            display: block;
+            margin-top: 60px;
         }}
         #legend {{
             position: fixed;
@@ -115,20 +137,6 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             border-color: #00d9ff;
             color: #00d9ff;
         }}
-        .node {{ cursor: pointer; }}
-        .node text {{
-            font-size: 10px;
-            fill: #ccc;
-            pointer-events: none;
-        }}
-        .link {{
-            stroke: #444;
-            stroke-opacity: 0.6;
-        }}
-        .link:hover {{
-            stroke: #00d9ff;
-            stroke-opacity: 1;
-        }}
     </style>
 </head>
 <body>
@@ -141,7 +149,7 @@ HTML_TEMPLATE = """<!DOCTYPE html>
         </div>
     </div>
 
-    <div id="graph"></div>
+    <canvas id="graph"></canvas>
 
     <div id="legend">
         <div class="legend-item">
@@ -168,12 +176,17 @@ HTML_TEMPLATE = """<!DOCTYPE html>
     </div>
 
     <div id="controls">
-        <button onclick="resetZoom()">Reset View</button>
-        <button onclick="toggleLabels()">Toggle Labels</button>
+        <button id="reset-view">Reset View</button>
+        <button id="toggle-labels">Toggle Labels</button>
     </div>
 
-    <script>
-        const data = {graph_data};
+    <!-- Graph JSON, gzipped and base64 encoded; repeated identifiers compress well -->
+    <script type="text/plain" id="graph-data">{graph_data}</script>
+
+    <!-- A module, so the data can be decompressed with a top-level await -->
+    <script type="module">
+        const compressed = await fetch("data:application/gzip;base64," + document.getElementById("graph-data").textContent);
+        const data = await new Response(compressed.body.pipeThrough(new DecompressionStream("gzip"))).json();
 
         const width = window.innerWidth;
         const height = window.innerHeight - 60;
@@ -188,95 +201,226 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             'default': '#888'
         }};
 
-        // Size based on out-degree (nodes with more connections are bigger)
-        const outDegree = {{}};
-        data.links.forEach(link => {{
-            const sourceId = typeof link.source === 'object' ? link.source.id : link.source;
-            outDegree[sourceId] = (outDegree[sourceId] || 0) + 1;
-        }});
+        // Largest node radius generate_visualization assigns, used as the hover search radius
+        const maxSize = {max_node_size};
 
-        const minSize = 4;
-        const maxSize = 25;
-        const maxDegree = Math.max(...Object.values(outDegree), 1);
+        let showLabels = true;
 
-        function getNodeSize(d) {{
-            const degree = outDegree[d.id] || 0;
-            return minSize + (degree / maxDegree) * (maxSize - minSize);
-        }}
+        // Color and label never change, so work them out once per node;
+        // the radius comes precomputed from the out-degree
+        data.nodes.forEach(d => {{
+            d.category = data.categories[d.cat];
+            d.language = data.languages[d.lang];
+            d.radius = d.r;
+            d.color = colorMap[d.category] || colorMap.default;
+            d.label = d.name.split('/').pop().split('.')[0];
+        }});
+        // Nodes are filled one color at a time to keep fillStyle changes down
+        const nodesByColor = d3.group(data.nodes, d => d.color);
 
-        let showLabels = true;
+        // Draw everything to one canvas instead of an SVG element per node and edge
+        const dpr = window.devicePixelRatio || 1;
+        const canvas = document.getElementById("graph");
+        canvas.width = width * dpr;
+        canvas.height = height * dpr;
+        canvas.style.width = width + "px";
+        canvas.style.height = height + "px";
+        const ctx = canvas.getContext("2d");
 
-        // Create SVG
-        const svg = d3.select("#graph")
-            .append("svg")
-            .attr("width", width)
-            .attr("height", height);
+        let transform = d3.zoomIdentity;
 
         // Add zoom behavior
-        const g = svg.append("g");
-
         const zoom = d3.zoom()
             .scaleExtent([0.1, 10])
             .on("zoom", (event) => {{
-                g.attr("transform", event.transform);
+                transform = event.transform;
+                scheduleDraw();
+            }});
+
+        // Positions laid out by generate_visualization are pinned, so nothing has to settle
+        const precomputed = data.nodes.length > 0 && data.nodes[0].x !== undefined;
+        if (precomputed) {{
+            data.nodes.forEach(d => {{
+                d.fx = d.x += width / 2;
+                d.fy = d.y += height / 2;
+            }});
+        }}
+
+        // DAG-friendly forces, shared by the page and the layout worker
+        // Faster decay settles in ~135 ticks instead of ~300; a coarser Barnes-Hut
+        // theta and capped charge distance cut the many-body work per tick
+        function applyForces(simulation, links) {{
+            return simulation
+                .alphaDecay(0.05)
+                .velocityDecay(0.4)
+                .force("link", d3.forceLink(links).id(d => d.id).distance(100).strength(0.5))
+                .force("charge", d3.forceManyBody().strength(-300).theta(1.2).distanceMax(500))
+                .force("center", d3.forceCenter(width / 2, height / 2))
+                .force("collision", d3.forceCollide().radius(d => d.radius + 15))
+                .force("y", d3.forceY(height / 2).strength(0.05));
+        }}
+
+        // The page's simulation only runs while a node is dragged
+        const simulation = applyForces(d3.forceSimulation(data.nodes), data.links)
+            .on("tick", scheduleDraw)
+            .alpha(0)
+            .stop();
+
+        if (precomputed) {{
+            draw();
+        }} else {{
+            layoutInWorker();
+        }}
+
+        // Settle the layout off the main thread so pan and zoom stay responsive,
+        // drawing the positions it sends back every few ticks
+        function layoutInWorker() {{
+            const source = `
+                // The full bundle: d3-force alone needs d3-dispatch, d3-quadtree and d3-timer
+                importScripts("https://d3js.org/d3.v7.min.js");
+                let width, height;
+                ${{applyForces}}
+                onmessage = ({{ data: msg }}) => {{
+                    ({{ width, height }} = msg);
+                    const simulation = applyForces(d3.forceSimulation(msg.nodes), msg.links).stop();
+                    const ticks = Math.ceil(Math.log(simulation.alphaMin()) / Math.log(1 - simulation.alphaDecay()));
+                    const positions = new Float32Array(msg.nodes.length * 2);
+                    for (let i = 1; i <= ticks; i++) {{
+                        simulation.tick();
+                        if (i % 10 === 0 || i === ticks) {{
+                            msg.nodes.forEach((d, j) => {{
+                                positions[2 * j] = d.x;
+                                positions[2 * j + 1] = d.y;
+                            }});
+                            postMessage({{ positions, done: i === ticks }});
+                        }}
+                    }}
+                }};
+            `;
+            // A blob URL, since workers can't be loaded from file:// pages
+            let worker;
+            try {{
+                worker = new Worker(URL.createObjectURL(new Blob([source], {{ type: "text/javascript" }})));
+            }} catch (error) {{
+                layoutOnPage();
+                return;
+            }}
+            // If the worker can't load d3 or fails, settle the layout here instead
+            worker.onerror = () => {{
+                worker.terminate();
+                layoutOnPage();
+            }};
+            worker.onmessage = ({{ data: msg }}) => {{
+                data.nodes.forEach((d, j) => {{
+                    d.x = msg.positions[2 * j];
+                    d.y = msg.positions[2 * j + 1];
+                }});
+                scheduleDraw();
+                if (msg.done) worker.terminate();
+            }};
+            worker.postMessage({{
+                width,
+                height,
+                nodes: data.nodes.map(d => ({{ id: d.id, radius: d.radius }})),
+                links: data.links.map(l => ({{ source: l.source.id, target: l.target.id }}))
+            }});
+        }}
+
+        function layoutOnPage() {{
+            simulation.alpha(1).restart();
+        }}
+
+        // Ticks, worker updates and zoom events can come faster than the screen
+        // refreshes; redraw at most once per animation frame
+        let drawPending = false;
+        function scheduleDraw() {{
+            if (drawPending) return;
+            drawPending = true;
+            requestAnimationFrame(() => {{
+                drawPending = false;
+                draw();
             }});
+        }}
+
+        function draw() {{
+            ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+            ctx.clearRect(0, 0, width, height);
+            ctx.setTransform(dpr * transform.k, 0, 0, dpr * transform.k, dpr * transform.x, dpr * transform.y);
+
+            // Links in a single stroke
+            ctx.beginPath();
+            for (const l of data.links) {{
+                ctx.moveTo(l.source.x, l.source.y);
+                ctx.lineTo(l.target.x, l.target.y);
+            }}
+            ctx.strokeStyle = "rgba(68, 68, 68, 0.6)";
+            ctx.lineWidth = 1;
+            ctx.stroke();
+
+            // Arrowheads at the edge of each target node, in a single fill
+            ctx.beginPath();
+            for (const l of data.links) {{
+                const dx = l.target.x - l.source.x;
+                const dy = l.target.y - l.source.y;
+                const len = Math.hypot(dx, dy);
+                if (!len) continue;
+                const ux = dx / len, uy = dy / len;
+                const tipX = l.target.x - ux * l.target.radius;
+                const tipY = l.target.y - uy * l.target.radius;
+                ctx.moveTo(tipX, tipY);
+                ctx.lineTo(tipX - ux * 8 + uy * 4, tipY - uy * 8 - ux * 4);
+                ctx.lineTo(tipX - ux * 8 - uy * 4, tipY - uy * 8 + ux * 4);
+                ctx.closePath();
+            }}
+            ctx.fillStyle = "#666";
+            ctx.fill();
+
+            // Nodes, one path per color
+            for (const [color, nodes] of nodesByColor) {{
+                ctx.beginPath();
+                for (const d of nodes) {{
+                    ctx.moveTo(d.x + d.radius, d.y);
+                    ctx.arc(d.x, d.y, d.radius, 0, 2 * Math.PI);
+                }}
+                ctx.fillStyle = color;
+                ctx.fill();
+            }}
+
+            if (showLabels) {{
+                ctx.font = "10px sans-serif";
+                ctx.fillStyle = "#ccc";
+                for (const d of data.nodes) {{
+                    ctx.fillText(d.label, d.x + 12, d.y + 4);
+                }}
+            }}
+        }}
 
-        svg.call(zoom);
-
-        // Create simulation with DAG-friendly forces
-        const simulation = d3.forceSimulation(data.nodes)
-            .force("link", d3.forceLink(data.links).id(d => d.id).distance(100).strength(0.5))
-            .force("charge", d3.forceManyBody().strength(-300))
-            .force("center", d3.forceCenter(width / 2, height / 2))
-            .force("collision", d3.forceCollide().radius(d => getNodeSize(d) + 15))
-            .force("y", d3.forceY(height / 2).strength(0.05));
-
-        // Draw links
-        const link = g.append("g")
-            .selectAll("line")
-            .data(data.links)
-            .join("line")
-            .attr("class", "link")
-            .attr("stroke-width", 1)
-            .attr("marker-end", "url(#arrow)");
-
-        // Add arrow marker
-        svg.append("defs").append("marker")
-            .attr("id", "arrow")
-            .attr("viewBox", "0 -5 10 10")
-            .attr("refX", 20)
-            .attr("refY", 0)
-            .attr("markerWidth", 8)
-            .attr("markerHeight", 8)
-            .attr("orient", "auto")
-            .append("path")
-            .attr("fill", "#666")
-            .attr("d", "M0,-5L10,0L0,5");
-
-        // Draw nodes
-        const node = g.append("g")
-            .selectAll("g")
-            .data(data.nodes)
-            .join("g")
-            .attr("class", "node")
+        // The node under the pointer, if any
+        function nodeAt(event) {{
+            const [x, y] = transform.invert(d3.pointer(event, canvas));
+            const d = simulation.find(x, y, maxSize);
+            return d && Math.hypot(d.x - x, d.y - y) <= d.radius ? d : undefined;
+        }}
+
+        // Drag is attached first so it takes the gesture over zoom when it starts on a node
+        d3.select(canvas)
             .call(d3.drag()
+                .subject(event => nodeAt(event.sourceEvent))
                 .on("start", dragstarted)
                 .on("drag", dragged)
-                .on("end", dragended));
-
-        node.append("circle")
-            .attr("r", d => getNodeSize(d))
-            .attr("fill", d => colorMap[d.category] || colorMap.default);
-
-        node.append("text")
-            .attr("dx", 12)
-            .attr("dy", 4)
-            .text(d => d.name.split('/').pop().split('.')[0]);
+                .on("end", dragended))
+            .call(zoom);
 
         // Tooltip
         const tooltip = d3.select("#tooltip");
 
-        node.on("mouseover", (event, d) => {{
+        canvas.addEventListener("mousemove", (event) => {{
+            const d = nodeAt(event);
+            canvas.style.cursor = d ? "pointer" : "default";
+            if (!d) {{
+                tooltip.classed("visible", false);
+                return;
+            }}
             tooltip.select(".name").text(d.name);
             tooltip.select(".info").text(
                 `Category: ${{d.category}}\\nLanguage: ${{d.language || 'N/A'}}\\nFile: ${{d.file || d.name}}`
@@ -284,20 +428,9 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             tooltip.classed("visible", true)
                 .style("left", (event.pageX + 15) + "px")
                 .style("top", (event.pageY - 10) + "px");
-        }})
-        .on("mouseout", () => {{
-            tooltip.classed("visible", false);
         }});
-
-        // Update positions
-        simulation.on("tick", () => {{
-            link
-                .attr("x1", d => d.source.x)
-                .attr("y1", d => d.source.y)
-                .attr("x2", d => d.target.x)
-                .attr("y2", d => d.target.y);
-
-            node.attr("transform", d => `translate(${{d.x}},${{d.y}})`);
+        canvas.addEventListener("mouseleave", () => {{
+            tooltip.classed("visible", false);
         }});
 
         // Drag functions
@@ -308,19 +441,23 @@ HTML_TEMPLATE = """<!DOCTYPE html>
         }}
 
         function dragged(event) {{
-            event.subject.fx = event.x;
-            event.subject.fy = event.y;
+            const [x, y] = transform.invert(d3.pointer(event, canvas));
+            event.subject.fx = x;
+            event.subject.fy = y;
         }}
 
         function dragended(event) {{
             if (!event.active) simulation.alphaTarget(0);
-            event.subject.fx = null;
-            event.subject.fy = null;
+            // Precomputed nodes stay where they are dropped
+            if (!precomputed) {{
+                event.subject.fx = null;
+                event.subject.fy = null;
+            }}
         }}
 
         // Control functions
         function resetZoom() {{
-            svg.transition().duration(500).call(
+            d3.select(canvas).transition().duration(500).call(
                 zoom.transform,
                 d3.zoomIdentity.translate(0, 0).scale(1)
             );
@@ -328,14 +465,86 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 
         function toggleLabels() {{
             showLabels = !showLabels;
-            node.selectAll("text").style("display", showLabels ? "block" : "none");
+            scheduleDraw();
         }}
+
+        document.getElementById("reset-view").addEventListener("click", resetZoom);
+        document.getElementById("toggle-labels").addEventListener("click", toggleLabels);
     </script>
 </body>
 </html>
 """
 
 
+def _layout(nodes: list, links: list, output_dir: Path) -> Optional[Dict[str, Tuple[float, float]]]:
+    """
+    Node positions centered on the origin, or None if they can't be computed.
+
+    Laid out with ForceAtlas2 where networkx has it and cached in layout.json
+    until the nodes or links change. Graphs over MAX_LAYOUT_NODES get None.
+    """
+    if len(nodes) > MAX_LAYOUT_NODES:
+        return None
+
+    layout_path = output_dir / LAYOUT_FILE
+    key = hashlib.sha256(
+        json.dumps([[n["id"] for n in nodes], [[l["source"], l["target"]] for l in links]]).encode("utf-8")
+    ).hexdigest()
+
+    try:
+        with open(layout_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("key") == key:
+            return {node_id: tuple(xy) for node_id, xy in cached["positions"].items()}
+    except (OSError, ValueError):
+        pass
+
+    graph = nx.Graph()
+    graph.add_nodes_from(n["id"] for n in nodes)
+    graph.add_edges_from((l["source"], l["target"]) for l in links)
+    scale = 50 * math.sqrt(max(len(nodes), 1))
+    try:
+        if hasattr(nx, "forceatlas2_layout"):
+            pos = nx.forceatlas2_layout(graph, max_iter=200, seed=42)
+            pos = nx.rescale_layout_dict(pos, scale=scale)
+        else:
+            pos = nx.spring_layout(graph, scale=scale, seed=42)
+    except ImportError:
+        # Both layouts need numpy; without it the browser lays the graph out itself
+        return None
+
+    positions = {str(node_id): (round(float(x), 1), round(float(y), 1)) for node_id, (x, y) in pos.items()}
+    try:
+        with open(layout_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "positions": positions}, f)
+    except OSError as e:
+        print(f"[WARNING] Could not cache layout: {e}")
+    return positions
+
+
+def _load_graph_tables(graph_path: Path) -> Tuple[List[str], List[dict], List[Tuple[int, int]]]:
+    """
+    Node names, their attributes and (source, target) index pairs of the graph.
+
+    Read from graph_snapshot.json when it is at least as new as graph.pkl,
+    which skips rebuilding the NetworkX graph; otherwise from the pickle.
+    """
+    snapshot_path = graph_path.with_name(SNAPSHOT_FILE)
+    try:
+        if snapshot_path.stat().st_mtime_ns >= graph_path.stat().st_mtime_ns:
+            data = orjson.loads(snapshot_path.read_bytes())
+            return data["nodes"], data["attrs"], data["edges"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    # Load graph straight from a read-only memory map, not through an 8 KiB read buffer
+    with open(graph_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        G = pickle.loads(mm)
+    node_names = list(G.nodes)
+    index = {name: i for i, name in enumerate(node_names)}
+    return node_names, [G.nodes[name] for name in node_names], [(index[u], index[v]) for u, v in G.edges()]
+
+
 def generate_visualization(repo_name: str, output_dir: Path = None, open_browser: bool = True) -> Path:
     """
     Generate an interactive HTML visualization of the code graph.
@@ -359,50 +568,63 @@ def generate_visualization(repo_name: str, output_dir: Path = None, open_browser
     if not graph_path.exists():
         raise FileNotFoundError(f"Graph not found: {graph_path}")
 
-    # Load graph
-    with open(graph_path, "rb") as f:
-        G = pickle.load(f)
+    node_names, node_attrs, edges = _load_graph_tables(graph_path)
 
     # Load tags for additional info
     tags_map = {}
     if tags_path.exists():
-        with open(tags_path, "r", encoding="utf-8") as f:
-            for line in f:
-                if line.strip():
-                    tag = json.loads(line)
-                    tags_map[tag["name"]] = tag
+        # JSONL, one tag per line: parsed in one orjson call as a single array
+        lines = [line for line in tags_path.read_bytes().splitlines() if line.strip()]
+        tags_map = {tag["name"]: tag for tag in orjson.loads(b"[" + b",".join(lines) + b"]")}
 
     # Build visualization data
-    nodes = []
-    node_ids = set()
-
-    for node_id in G.nodes():
-        tag = tags_map.get(node_id, {})
-        node_data = {
+    nodes = [
+        {
             "id": node_id,
             "name": node_id,
-            "category": G.nodes[node_id].get("category", tag.get("category", "unknown")),
-            "language": G.nodes[node_id].get("language", tag.get("language", "")),
-            "file": G.nodes[node_id].get("file", tag.get("rel_fname", "")),
+            "category": attrs.get("category", tag.get("category", "unknown")),
+            "language": attrs.get("language", tag.get("language", "")),
+            "file": attrs.get("file", tag.get("rel_fname", "")),
         }
-        nodes.append(node_data)
-        node_ids.add(node_id)
+        for node_id, attrs, tag in zip(node_names, node_attrs, (tags_map.get(name, {}) for name in node_names))
+    ]
 
     # Build links as DAG (remove bidirectional edges, keep only one direction)
     links = []
     seen_edges = set()
-    for source, target in G.edges():
-        if source in node_ids and target in node_ids:
-            # Create a canonical edge representation to detect bidirectional
-            edge_pair = tuple(sorted([source, target]))
-            if edge_pair not in seen_edges:
-                seen_edges.add(edge_pair)
-                links.append({"source": source, "target": target})
-
-    graph_data = {"nodes": nodes, "links": links}
-
-    # Count files
-    file_count = sum(1 for n in nodes if n["category"] == "file")
+    for source, target in edges:
+        # Create a canonical edge representation to detect bidirectional
+        edge_pair = (source, target) if source < target else (target, source)
+        if edge_pair not in seen_edges:
+            seen_edges.add(edge_pair)
+            links.append({"source": node_names[source], "target": node_names[target]})
+
+    # Size based on out-degree (nodes with more connections are bigger)
+    out_degree = Counter(link["source"] for link in links)
+    max_degree = max(out_degree.values(), default=0) or 1
+    for node_data in nodes:
+        node_data["r"] = round(
+            MIN_NODE_SIZE + out_degree[node_data["id"]] / max_degree * (MAX_NODE_SIZE - MIN_NODE_SIZE), 2
+        )
+
+    positions = _layout(nodes, links, output_dir)
+    if positions:
+        for node_data in nodes:
+            node_data["x"], node_data["y"] = positions[node_data["id"]]
+
+    # Each distinct category and language is sent once; nodes carry its index.
+    # Files are counted in the same pass.
+    categories: Dict[str, int] = {}
+    languages: Dict[str, int] = {}
+    file_count = 0
+    for node_data in nodes:
+        category = node_data.pop("category")
+        if category == "file":
+            file_count += 1
+        node_data["cat"] = categories.setdefault(category, len(categories))
+        node_data["lang"] = languages.setdefault(node_data.pop("language"), len(languages))
+
+    graph_data = {"nodes": nodes, "links": links, "categories": list(categories), "languages": list(languages)}
 
     # Generate HTML
     html = HTML_TEMPLATE.format(
@@ -410,17 +632,21 @@ def generate_visualization(repo_name: str, output_dir: Path = None, open_browser
         node_count=len(nodes),
         edge_count=len(links),
         file_count=file_count,
-        graph_data=json.dumps(graph_data)
+        max_node_size=MAX_NODE_SIZE,
+        graph_data=base64.b64encode(
+            gzip.compress(json.dumps(graph_data).encode("utf-8"), compresslevel=6)
+        ).decode("ascii")
     )
 
     # Save HTML
     html_path = output_dir / "graph.html"
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write(html)
+    html_path.write_bytes(html.encode("utf-8"))
 
     print(f"Visualization saved to: {html_path}")
 
     if open_browser:
+        # Imported here so callers that don't open a browser skip its start-up cost
+        import webbrowser
         webbrowser.open(f"file://{html_path.absolute()}")
 
     return html_path